@@ -4,7 +4,11 @@ Example usage of the Video Services API Client
 Copy these examples into your notebook or use them as reference.
 """
 
-from src.client import VideoServicesClient, quick_extract, quick_clip, quick_gif
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from src.client import AsyncVideoServicesClient, VideoServicesClient, quick_extract, quick_clip, quick_gif
 from src.config import Config
 
 default_config = Config()
@@ -56,24 +60,21 @@ def example_3_clip_video():
     """Clip a video and save it."""
     print("=== Example 3: Clip Video ===")
     
-    # First extract a video URL
+    # The server resolves post URLs itself, so there is no need to call
+    # extract_video_url first (that would cost an extra round-trip)
     test_url = EXAMPLE_URLS["twitter"]
     
     with VideoServicesClient() as client:
         try:
-            # Extract video URL first
-            video_url = client.extract_video_url(test_url)
-            print(f"Using video URL: {video_url[:60]}...")
-            
             # Clip first 5 seconds
-            video_bytes = client.clip_video(
-                url=video_url,
+            saved_path = client.clip_video(
+                url=test_url,
                 start_time=0.0,
                 end_time=5.0,
                 save_to="clipped_video.mp4"
             )
             
-            print(f"Clipped video size: {len(video_bytes)} bytes")
+            print(f"Clipped video size: {saved_path.stat().st_size} bytes")
             print("✓ Video saved as 'clipped_video.mp4'")
             
         except Exception as e:
@@ -88,7 +89,7 @@ def example_4_create_gif_from_url():
     with VideoServicesClient() as client:
         try:
             # Create GIF with custom options
-            gif_bytes = client.url_to_gif(
+            saved_path = client.url_to_gif(
                 url=test_url,
                 start_time=0.0,
                 end_time=3.0,
@@ -100,12 +101,35 @@ def example_4_create_gif_from_url():
                 save_to="output.gif"
             )
             
-            print(f"GIF size: {len(gif_bytes)} bytes")
+            print(f"GIF size: {saved_path.stat().st_size} bytes")
             print("✓ GIF saved as 'output.gif'")
             
         except Exception as e:
             print(f"Error creating GIF: {e}")
 
+def example_5_clip_then_gif():
+    """Clip a video and turn the clip into a GIF without touching disk."""
+    print("=== Example 5: Clip then GIF ===")
+    
+    test_url = EXAMPLE_URLS["twitter"]
+    
+    with VideoServicesClient() as client:
+        try:
+            # No save_to, so the clip comes back as bytes and stays in memory
+            video_bytes = client.clip_video(url=test_url, start_time=0.0, end_time=3.0)
+            print(f"Clipped video size: {len(video_bytes)} bytes")
+            
+            saved_path = client.make_gif_from_stream(
+                io.BytesIO(video_bytes),
+                filename="clip.mp4",
+                resize="50%",
+                save_to="clip.gif"
+            )
+            print(f"GIF size: {saved_path.stat().st_size} bytes")
+            
+        except Exception as e:
+            print(f"Error creating GIF from clip: {e}")
+
 def example_6_quick_functions():
     """Use the quick convenience functions."""
     print("=== Example 6: Quick Functions ===")
@@ -117,9 +141,9 @@ def example_6_quick_functions():
         video_url = quick_extract(test_url)
         print(f"Quick extracted: {video_url[:60]}...")
         
-        # Quick clip (saves to file)
+        # Quick clip (saves to file) straight from the post URL
         quick_clip(
-            url=video_url,
+            url=test_url,
             start_time=0.0,
             end_time=2.0,
             save_to="quick_clip.mp4"
@@ -140,23 +164,46 @@ def example_6_quick_functions():
     except Exception as e:
         print(f"Error with quick functions: {e}")
 
+def example_7_batch_extract():
+    """Extract video URLs for several posts concurrently."""
+    print("=== Example 7: Batch Extract ===")
+    
+    async def _run():
+        async with AsyncVideoServicesClient() as client:
+            return await client.batch_extract(list(EXAMPLE_URLS.values()))
+    
+    try:
+        video_urls = asyncio.run(_run())
+        for name, video_url in zip(EXAMPLE_URLS, video_urls):
+            print(f"{name}: {video_url[:60]}...")
+            
+    except Exception as e:
+        print(f"Error with batch extract: {e}")
+
+def _safe_run(example):
+    """Run an example, reporting failures instead of raising."""
+    try:
+        example()
+        print()
+    except Exception as e:
+        print(f"Example failed: {e}")
+        print()
+
 def run_all_examples():
-    """Run all examples in sequence."""
+    """Run all examples concurrently; they are independent network-bound workflows."""
     examples = [
         example_1_basic_usage,
         example_2_extract_video_url,
         example_3_clip_video,
         example_4_create_gif_from_url,
-        example_6_quick_functions
+        example_5_clip_then_gif,
+        example_6_quick_functions,
+        example_7_batch_extract
     ]
     
-    for example in examples:
-        try:
-            example()
-            print()
-        except Exception as e:
-            print(f"Example failed: {e}")
-            print()
+    # Output from different examples may interleave
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(_safe_run, examples))
 
 if __name__ == "__main__":
     print("Video Services API Client Examples")
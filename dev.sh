@@ -59,16 +59,24 @@ function test() {
     pytest
 }
 
+# pytest-xdist flags when it is installed; --dist=loadfile keeps each test
+# file (and its patches and fixtures) on a single worker
+function xdist_args() {
+    if python -c "import xdist" 2>/dev/null; then
+        echo "-n auto --dist=loadfile"
+    fi
+}
+
 # Run unit tests only
 function test_unit() {
     print_header "Running unit tests"
-    pytest -m unit -v
+    pytest -m unit -v $(xdist_args)
 }
 
 # Run integration tests
 function test_integration() {
     print_header "Running integration tests"
-    pytest -m integration -v
+    pytest -m integration -v $(xdist_args)
 }
 
 # Run E2E tests
@@ -165,6 +173,13 @@ function create_test_video() {
     python tests/fixtures/create_sample_video.py
 }
 
+# Re-record the VCR cassettes against the live sites
+function record_cassettes() {
+    print_header "Recording VCR cassettes"
+    rm -f tests/fixtures/vcr_cassettes/*.yaml
+    VCR_RECORD_MODE=once pytest tests/integration/test_video_with_vcr.py -v
+}
+
 # Show help
 function help() {
     echo "Video Services Development Helper"
@@ -187,6 +202,7 @@ function help() {
     echo "  docker_run       Run Docker container"
     echo "  clean            Clean up generated files"
     echo "  create_test_video Create a sample test video"
+    echo "  record_cassettes Re-record the VCR cassettes (network required)"
     echo "  help             Show this help message"
 }
 
@@ -198,7 +214,7 @@ fi
 
 # Execute the requested function
 case "$1" in
-    (install|typecheck|lint|format|test|test_unit|test_integration|test_e2e|test_cov|check|serve|docker_build|docker_run|clean|create_test_video|help)
+    (install|typecheck|lint|format|test|test_unit|test_integration|test_e2e|test_cov|check|serve|docker_build|docker_run|clean|create_test_video|record_cassettes|help)
         "$1"
         ;;
     (*)
@@ -1,10 +1,38 @@
+import os
 from typing import Dict, Any
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from .routes import video
 
 
+# Largest request body accepted, checked against Content-Length before the
+# multipart upload is read
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES") or 200 * 1024 * 1024)
+
+
+class UploadSizeLimitMiddleware:
+    """Reject requests whose declared Content-Length exceeds a limit with 413."""
+
+    def __init__(self, app: ASGIApp, max_bytes: int) -> None:
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"content-length" and value.isdigit() and int(value) > self.max_bytes:
+                    response = JSONResponse(
+                        status_code=413,
+                        content={"detail": f"Upload too large (limit is {self.max_bytes} bytes)"},
+                    )
+                    await response(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
+
+
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
     app = FastAPI(
@@ -13,6 +41,9 @@ def create_app() -> FastAPI:
         version="0.1.0",
     )
 
+    # Added before CORS so it runs inside it and 413s still carry CORS headers
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=MAX_UPLOAD_BYTES)
+
     # Configure CORS
     app.add_middleware(
         CORSMiddleware,
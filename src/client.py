@@ -7,26 +7,76 @@ A convenient HTTPX-based client for interacting with the Video Services API.
 Can be used interactively in notebooks or as a standalone script.
 """
 
+import asyncio
+import atexit
+import contextlib
+import functools
+import hashlib
 import httpx
+import importlib.util
 import json
+import os
+import shutil
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Optional, Literal, Union
-from urllib.parse import urljoin
+from typing import Any, Awaitable, BinaryIO, Iterable, Iterator, Optional, Literal, Union
+from urllib.parse import urlencode
 
 from .config import Config
 
+try:
+    # orjson parses bytes directly and is noticeably faster; it is optional
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 default_config = Config.from_env()
 
+# Upper bound on requests a batch_* helper keeps in flight at once, so a long
+# URL list doesn't flood the API (each clip/GIF request runs ffmpeg server-side).
+DEFAULT_BATCH_CONCURRENCY = 10
 
-class VideoServicesClient:
-    """Client for interacting with the Video Services API."""
+# httpx drops idle connections after 5s by default, while uvicorn/nginx in front
+# of the API keep them for much longer; hold them long enough to span the gaps
+# between chained extract -> clip -> gif calls.
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+# Read size used when streaming video/GIF responses to disk; large chunks
+# amortize the per-write syscall cost for multi-megabyte clips.
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Number of post URL -> video URL resolutions remembered per client, and how
+# long they stay valid: platforms hand out signed CDN URLs that expire, so a
+# resolution is only reused for a limited time.
+EXTRACT_CACHE_SIZE = 512
+EXTRACT_CACHE_TTL = 3600.0
+
+# Seconds the nearly-static health and API info responses are reused for.
+HEALTH_CACHE_TTL = 10.0
+API_INFO_CACHE_TTL = 60.0
+
+# Size cap for the optional on-disk clip/GIF cache (see ``cache_dir``); the
+# least recently used results are evicted beyond it.
+DEFAULT_MAX_CACHE_BYTES = 1024 * 1024 * 1024
+
+# HTTP/2 needs the optional h2 package (`httpx[http2]`). It is negotiated via
+# TLS ALPN, so it only kicks in behind an HTTPS proxy; plain HTTP stays on 1.1.
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class _BaseClient:
+    """Configuration and URL handling shared by the sync and async clients."""
     
     def __init__(
         self, 
         config: Optional[Config] = None,
         base_url: Optional[str] = None,
         auth: Optional[tuple[str, str]] = None,
-        timeout: Optional[float] = None
+        timeout: Optional[float] = None,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_cache_bytes: int = DEFAULT_MAX_CACHE_BYTES
     ):
         """
         Initialize the client.
@@ -36,6 +86,8 @@ class VideoServicesClient:
             base_url: Override base URL from config
             auth: Override auth from config
             timeout: Override timeout from config
+            cache_dir: Directory for caching clip/GIF results on disk (disabled if None)
+            max_cache_bytes: Size above which the oldest cached results are evicted
         """
         # Use provided config or default
         if config is None:
@@ -46,22 +98,26 @@ class VideoServicesClient:
         self.auth = auth or config.auth
         self.timeout = timeout or config.timeout
         self.config = config
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir is not None else None
+        self.max_cache_bytes = max_cache_bytes
         
-        self.client = httpx.Client(
-            auth=self.auth,
-            timeout=self.timeout,
-            follow_redirects=True
-        )
-    
-    def __enter__(self):
-        return self
-    
-    def __exit__(self, exc_type, exc_val, exc_tb):  # type: ignore[no-untyped-def]
-        self.client.close()
+        self._extract_cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._response_cache: dict[str, tuple[float, Any]] = {}
+        
+        # Endpoint URLs never change for a client, so build them once
+        self._ep = {
+            "health": self._url("/health"),
+            "root": self._url("/"),
+            "extract": self._url("/api/video/extract-url"),
+            "clip": self._url("/api/video/clip"),
+            "url_to_gif": self._url("/api/video/to-gif/from-url"),
+            "file_to_gif": self._url("/api/video/to-gif/from-file"),
+        }
     
     def _url(self, endpoint: str) -> str:
         """Build full URL for an endpoint."""
-        return urljoin(self.base_url + '/', endpoint.lstrip('/'))
+        # base_url has no trailing slash, so plain concatenation is all urljoin did here
+        return f"{self.base_url}/{endpoint.lstrip('/')}"
     
     def _resolve_output_path(self, path: Union[str, Path]) -> Path:
         """Resolve output path, using default output directory if relative."""
@@ -72,24 +128,306 @@ class VideoServicesClient:
             path = output_dir / path
         return path
     
-    def health_check(self) -> Any:
-        """Check if the API is healthy."""
-        response = self.client.get(self._url("/health"))
-        response.raise_for_status()
-        return response.json()
+    def _get_cached_extract(self, url: str) -> Optional[str]:
+        """Return a previously extracted video URL younger than EXTRACT_CACHE_TTL, marking it as recently used."""
+        entry = self._extract_cache.get(url)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= EXTRACT_CACHE_TTL:
+            del self._extract_cache[url]
+            return None
+        self._extract_cache.move_to_end(url)
+        return entry[1]
     
-    def get_api_info(self) -> Any:
-        """Get API information and available endpoints."""
-        response = self.client.get(self._url("/"))
-        response.raise_for_status()
-        return response.json()
+    def _cache_extract(self, url: str, video_url: str) -> None:
+        """Remember an extracted video URL, evicting the least recently used entry."""
+        self._extract_cache[url] = (time.monotonic(), video_url)
+        self._extract_cache.move_to_end(url)
+        if len(self._extract_cache) > EXTRACT_CACHE_SIZE:
+            self._extract_cache.popitem(last=False)
+    
+    def _get_cached_response(self, key: str, ttl: float) -> Optional[Any]:
+        """Return a cached response body if it is younger than ``ttl`` seconds."""
+        entry = self._response_cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+        return None
+    
+    def _prepare_output_path(self, save_to: Union[str, Path]) -> Path:
+        """Resolve the output path and make sure its parent directory exists."""
+        save_path = self._resolve_output_path(save_to)
+        # Not remembered per client: the directory may be removed between saves
+        save_path.parent.mkdir(parents=True, exist_ok=True)
+        return save_path
+    
+    def _disk_cache_path(self, *key_parts: Any) -> Optional[Path]:
+        """Return the cache file for a request's inputs, or None if the disk cache is disabled."""
+        if self.cache_dir is None:
+            return None
+        # Clients pointed at different servers may share a cache_dir
+        key = hashlib.blake2b(
+            "|".join(map(str, (self.base_url, *key_parts))).encode(), digest_size=16
+        ).hexdigest()
+        return self.cache_dir / key[:2] / key
+    
+    def _load_from_disk_cache(
+        self,
+        cache_path: Optional[Path],
+        save_to: Optional[Union[str, Path]],
+        label: str
+    ) -> Optional[Union[bytes, Path]]:
+        """Return a cached result (copied to ``save_to`` if given), or None on a miss."""
+        if cache_path is None or not cache_path.is_file():
+            return None
+        # Refresh the mtime so eviction drops the least recently used entries
+        os.utime(cache_path)
+        if not save_to:
+            return cache_path.read_bytes()
+        save_path = self._prepare_output_path(save_to)
+        shutil.copyfile(cache_path, save_path)
+        print(f"Saved {label} to: {save_path} (cached)")
+        return save_path
+    
+    def _store_in_disk_cache(self, cache_path: Optional[Path], result: Union[bytes, Path]) -> None:
+        """Store a fresh result in the disk cache and evict old entries beyond max_cache_bytes."""
+        if cache_path is None:
+            return
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write under a unique temporary name so readers never see a partial
+        # file and concurrent writers of the same entry don't collide
+        with _atomic_output(cache_path) as f:
+            if isinstance(result, Path):
+                with open(result, "rb") as src:
+                    shutil.copyfileobj(src, f)
+            else:
+                f.write(result)
+        self._evict_disk_cache()
+    
+    def _evict_disk_cache(self) -> None:
+        """Delete the least recently used cache files until the cache fits max_cache_bytes."""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*/*"):
+            if path.name.startswith("."):
+                # Another writer's in-progress temporary file
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # Removed concurrently by another client sharing the cache
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        
+        for _, size, path in sorted(entries):
+            if total <= self.max_cache_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+# MP4/GIF bodies are already compressed; ask the server (or any proxy) not to
+# spend CPU gzipping them again. JSON endpoints keep httpx's default
+# Accept-Encoding, which only advertises codecs it has decoders for.
+_BINARY_HEADERS = {"Accept-Encoding": "identity"}
+
+
+@contextlib.contextmanager
+def _atomic_output(save_path: Path) -> Iterator[BinaryIO]:
+    """
+    Open a temporary file next to ``save_path`` that replaces it only on success.
+    
+    A failed download (or a preallocated file that never got filled) is removed
+    instead of leaving a partial file behind or clobbering an existing one.
+    """
+    tmp_name = save_path.parent / f".{save_path.name}.{os.urandom(8).hex()}.part"
+    # Unlike mkstemp (always 0600), this lets the kernel apply the current
+    # umask, so saved files get the same mode a plain open() would give them
+    fd = os.open(tmp_name, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+            # Drop any reserved space the decoded body didn't use
+            f.truncate()
+        os.replace(tmp_name, save_path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_name)
+        raise
+
+
+def _preallocate(f: Any, response: httpx.Response) -> None:
+    """Reserve disk space for a download of known size so the file is allocated in one go."""
+    size = int(response.headers.get("content-length", "0"))
+    if size > 0 and hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+        except OSError:
+            # Some filesystems (e.g. tmpfs on older kernels) don't support it
+            pass
+
+
+def _file_cache_key(video_path: Path) -> tuple[str, int, int]:
+    """Identify a local video for the disk cache by path, size and modification time."""
+    stat = video_path.stat()
+    return (str(video_path.resolve()), stat.st_size, stat.st_mtime_ns)
+
+
+def _decode_video_url(content: bytes) -> str:
+    """Decode the extract-url response body; the server always answers with JSON."""
+    return _json_loads(content)["video_url"]
+
+
+@functools.lru_cache(maxsize=64)
+def _gif_options_query(resize: str, speed: str, fps: int, quality: int, loop: str) -> str:
+    """Encode the GIF option part of the query string; the option space is small and cacheable."""
+    return urlencode({
+        "resize": resize,
+        "speed": speed,
+        "fps": fps,
+        "quality": quality,
+        "loop": loop
+    })
+
+
+def _gif_url(
+    endpoint: str,
+    url: str,
+    start_time: float,
+    end_time: float,
+    resize: str,
+    speed: str,
+    fps: int,
+    quality: int,
+    loop: str,
+) -> str:
+    """Build the full URL-to-GIF request URL, reusing the cached options query."""
+    clip_query = urlencode({"url": url, "start_time": start_time, "end_time": end_time})
+    return f"{endpoint}?{clip_query}&{_gif_options_query(resize, speed, fps, quality, loop)}"
+
+
+class VideoServicesClient(_BaseClient):
+    """Client for interacting with the Video Services API."""
     
-    def extract_video_url(self, url: str) -> str:
+    def __init__(
+        self, 
+        config: Optional[Config] = None,
+        base_url: Optional[str] = None,
+        auth: Optional[tuple[str, str]] = None,
+        timeout: Optional[float] = None,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        http2: bool = HTTP2_AVAILABLE,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_cache_bytes: int = DEFAULT_MAX_CACHE_BYTES
+    ):
+        """
+        Initialize the client.
+        
+        Args:
+            config: Configuration object (uses default config if None)
+            base_url: Override base URL from config
+            auth: Override auth from config
+            timeout: Override timeout from config
+            max_connections: Maximum number of concurrent connections
+            max_keepalive_connections: Maximum number of idle connections kept in the pool
+            keepalive_expiry: Seconds an idle connection is kept open for reuse
+            http2: Negotiate HTTP/2 so concurrent requests share one connection
+                (defaults to True when the h2 package is installed)
+            cache_dir: Directory for caching clip/GIF results on disk (disabled if None)
+            max_cache_bytes: Size above which the oldest cached results are evicted
+        """
+        super().__init__(
+            config=config,
+            base_url=base_url,
+            auth=auth,
+            timeout=timeout,
+            cache_dir=cache_dir,
+            max_cache_bytes=max_cache_bytes
+        )
+        
+        self.client = httpx.Client(
+            auth=self.auth,
+            timeout=self.timeout,
+            follow_redirects=True,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            )
+        )
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):  # type: ignore[no-untyped-def]
+        self.client.close()
+    
+    def _download(
+        self,
+        method: str,
+        url: str,
+        save_to: Union[str, Path],
+        label: str,
+        chunk_size: int,
+        **kwargs: Any
+    ) -> Path:
+        """Stream a response body straight to disk without buffering it in memory."""
+        save_path = self._prepare_output_path(save_to)
+        with self.client.stream(method, url, **kwargs) as response:
+            response.raise_for_status()
+            with _atomic_output(save_path) as f:
+                _preallocate(f, response)
+                # writelines drains the iterator in C, without a Python-level loop
+                f.writelines(response.iter_bytes(chunk_size=chunk_size))
+        print(f"Saved {label} to: {save_path}")
+        return save_path
+    
+    def health_check(self, use_cache: bool = True) -> Any:
+        """Check if the API is healthy (cached for HEALTH_CACHE_TTL seconds unless ``use_cache`` is False)."""
+        if use_cache:
+            cached = self._get_cached_response("health", HEALTH_CACHE_TTL)
+            if cached is not None:
+                return cached
+        
+        try:
+            response = self.client.get(self._ep["health"])
+            response.raise_for_status()
+        except Exception:
+            self._response_cache.pop("health", None)
+            raise
+        
+        data = _json_loads(response.content)
+        self._response_cache["health"] = (time.monotonic(), data)
+        return data
+    
+    def get_api_info(self, use_cache: bool = True) -> Any:
+        """Get API information and available endpoints (cached for API_INFO_CACHE_TTL seconds)."""
+        if use_cache:
+            cached = self._get_cached_response("info", API_INFO_CACHE_TTL)
+            if cached is not None:
+                return cached
+        
+        try:
+            response = self.client.get(self._ep["root"])
+            response.raise_for_status()
+        except Exception:
+            self._response_cache.pop("info", None)
+            raise
+        
+        data = _json_loads(response.content)
+        self._response_cache["info"] = (time.monotonic(), data)
+        return data
+    
+    def extract_video_url(self, url: str, use_cache: bool = True) -> str:
         """
         Extract direct video URL from a social media post URL.
         
         Args:
             url: Social media post URL (X.com, LinkedIn, etc.)
+            use_cache: Reuse a URL this client already extracted instead of asking the server again
             
         Returns:
             Direct video URL string
@@ -97,61 +435,72 @@ class VideoServicesClient:
         Raises:
             httpx.HTTPStatusError: If the request fails
         """
+        if use_cache:
+            cached = self._get_cached_extract(url)
+            if cached is not None:
+                return cached
+        
         response = self.client.get(
-            self._url("/api/video/extract-url"),
+            self._ep["extract"],
             params={"url": url}
         )
         response.raise_for_status()
         
-        # Handle both dict response and Response object
-        if response.headers.get("content-type", "").startswith("application/json"):
-            return response.json()["video_url"]
-        else:
-            # Handle Response object case
-            data = json.loads(response.content.decode())
-            return data["video_url"]
+        video_url = _decode_video_url(response.content)
+        
+        self._cache_extract(url, video_url)
+        return video_url
     
     def clip_video(
         self, 
         url: str, 
         start_time: float, 
         end_time: float,
-        save_to: Optional[Union[str, Path]] = None
-    ) -> bytes:
+        save_to: Optional[Union[str, Path]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        accurate: bool = True
+    ) -> Union[bytes, Path]:
         """
         Clip a video between specified timestamps.
         
         Args:
-            url: Video URL or social media post URL
+            url: Video URL or social media post URL. Post URLs are resolved
+                server-side, so there is no need to call extract_video_url first.
             start_time: Start time in seconds
             end_time: End time in seconds  
-            save_to: Optional path to save the clipped video
+            save_to: Optional path to stream the clipped video to
+            chunk_size: Read size in bytes when streaming to ``save_to``
+            accurate: Frame-exact cuts (server re-encodes around them); False
+                stream-copies from the nearest keyframes, which is much faster
             
         Returns:
-            Video bytes
+            Video bytes, or the path of the saved file if ``save_to`` is given
             
         Raises:
             httpx.HTTPStatusError: If the request fails
         """
-        response = self.client.get(
-            self._url("/api/video/clip"),
-            params={
-                "url": url,
-                "start_time": start_time,
-                "end_time": end_time
-            }
-        )
-        response.raise_for_status()
+        endpoint = self._ep["clip"]
+        params = {
+            "url": url,
+            "start_time": start_time,
+            "end_time": end_time,
+            "accurate": accurate
+        }
         
-        video_bytes = response.content
+        cache_path = self._disk_cache_path("clip", url, start_time, end_time, accurate)
+        cached = self._load_from_disk_cache(cache_path, save_to, "clipped video")
+        if cached is not None:
+            return cached
         
         if save_to:
-            save_path = self._resolve_output_path(save_to)
-            save_path.parent.mkdir(parents=True, exist_ok=True)
-            save_path.write_bytes(video_bytes)
-            print(f"Saved clipped video to: {save_path}")
+            result = self._download("GET", endpoint, save_to, "clipped video", chunk_size, params=params, headers=_BINARY_HEADERS)
+        else:
+            response = self.client.get(endpoint, params=params, headers=_BINARY_HEADERS)
+            response.raise_for_status()
+            result = response.content
         
-        return video_bytes
+        self._store_in_disk_cache(cache_path, result)
+        return result
     
     def url_to_gif(
         self,
@@ -163,13 +512,15 @@ class VideoServicesClient:
         fps: int = 8,
         quality: int = 75,
         loop: Literal["forever", "once", "none"] = "forever",
-        save_to: Optional[Union[str, Path]] = None
-    ) -> bytes:
+        save_to: Optional[Union[str, Path]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Union[bytes, Path]:
         """
         Convert video from URL to GIF with clipping and options.
         
         Args:
-            url: Video URL or social media post URL
+            url: Video URL or social media post URL. Post URLs are resolved
+                server-side, so there is no need to call extract_video_url first.
             start_time: Start time in seconds
             end_time: End time in seconds
             resize: Resize percentage 
@@ -177,38 +528,31 @@ class VideoServicesClient:
             fps: Frames per second (3-10)
             quality: GIF quality (0-100)
             loop: Loop behavior
-            save_to: Optional path to save the GIF
+            save_to: Optional path to stream the GIF to
+            chunk_size: Read size in bytes when streaming to ``save_to``
             
         Returns:
-            GIF bytes
+            GIF bytes, or the path of the saved file if ``save_to`` is given
             
         Raises:
             httpx.HTTPStatusError: If the request fails
         """
-        response = self.client.get(
-            self._url("/api/video/to-gif/from-url"),
-            params={
-                "url": url,
-                "start_time": start_time,
-                "end_time": end_time,
-                "resize": resize,
-                "speed": speed,
-                "fps": fps,
-                "quality": quality,
-                "loop": loop
-            }
-        )
-        response.raise_for_status()
+        request_url = _gif_url(self._ep["url_to_gif"], url, start_time, end_time, resize, speed, fps, quality, loop)
         
-        gif_bytes = response.content
+        cache_path = self._disk_cache_path("url_to_gif", request_url)
+        cached = self._load_from_disk_cache(cache_path, save_to, "GIF")
+        if cached is not None:
+            return cached
         
         if save_to:
-            save_path = self._resolve_output_path(save_to)
-            save_path.parent.mkdir(parents=True, exist_ok=True)
-            save_path.write_bytes(gif_bytes)
-            print(f"Saved GIF to: {save_path}")
+            result = self._download("GET", request_url, save_to, "GIF", chunk_size, headers=_BINARY_HEADERS)
+        else:
+            response = self.client.get(request_url, headers=_BINARY_HEADERS)
+            response.raise_for_status()
+            result = response.content
         
-        return gif_bytes
+        self._store_in_disk_cache(cache_path, result)
+        return result
     
     def make_gif_from_file(
         self,
@@ -218,8 +562,9 @@ class VideoServicesClient:
         fps: int = 8, 
         quality: int = 75,
         loop: Literal["forever", "once", "none"] = "forever",
-        save_to: Optional[Union[str, Path]] = None
-    ) -> bytes:
+        save_to: Optional[Union[str, Path]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Union[bytes, Path]:
         """
         Convert uploaded video file to GIF.
         
@@ -230,10 +575,11 @@ class VideoServicesClient:
             fps: Frames per second (3-10)
             quality: GIF quality (0-100)
             loop: Loop behavior
-            save_to: Optional path to save the GIF
+            save_to: Optional path to stream the GIF to
+            chunk_size: Read size in bytes when streaming to ``save_to``
             
         Returns:
-            GIF bytes
+            GIF bytes, or the path of the saved file if ``save_to`` is given
             
         Raises:
             httpx.HTTPStatusError: If the request fails
@@ -242,33 +588,524 @@ class VideoServicesClient:
         if not video_path.exists():
             raise FileNotFoundError(f"Video file not found: {video_path}")
         
+        cache_path = self._disk_cache_path(
+            "file_to_gif", *_file_cache_key(video_path), resize, speed, fps, quality, loop
+        )
+        cached = self._load_from_disk_cache(cache_path, save_to, "GIF")
+        if cached is not None:
+            return cached
+        
         with open(video_path, 'rb') as f:
-            files = {"video": (video_path.name, f, "video/mp4")}
-            data = dict(
-                resize=resize,
-                speed=speed,
-                fps=fps,
-                quality=quality,  
-                loop=loop
+            result = self.make_gif_from_stream(
+                f, video_path.name, resize, speed, fps, quality, loop, save_to, chunk_size
             )
+        
+        self._store_in_disk_cache(cache_path, result)
+        return result
+    
+    def make_gif_from_stream(
+        self,
+        stream: BinaryIO,
+        filename: str = "video.mp4",
+        resize: Literal["25%", "50%", "75%", "100%"] = "100%",
+        speed: Literal["0.5x", "1x", "2x", "4x"] = "1x",
+        fps: int = 8, 
+        quality: int = 75,
+        loop: Literal["forever", "once", "none"] = "forever",
+        save_to: Optional[Union[str, Path]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Union[bytes, Path]:
+        """
+        Convert video data from a file-like object to GIF.
+        
+        Useful for chaining with ``clip_video`` without writing the clip to disk,
+        e.g. by wrapping the clip bytes in ``io.BytesIO``.
+        
+        Args:
+            stream: Binary file-like object with the video content
+            filename: File name reported to the server
+            resize: Resize percentage
+            speed: Speed multiplier  
+            fps: Frames per second (3-10)
+            quality: GIF quality (0-100)
+            loop: Loop behavior
+            save_to: Optional path to stream the GIF to
+            chunk_size: Read size in bytes when streaming to ``save_to``
+            
+        Returns:
+            GIF bytes, or the path of the saved file if ``save_to`` is given
             
-            response = self.client.post(
-                self._url("/api/video/to-gif/from-file"),
-                files=files,
-                data=data
+        Raises:
+            httpx.HTTPStatusError: If the request fails
+        """
+        # Passing the stream (not its bytes) lets httpx send the multipart
+        # body in chunks, with Content-Length from fstat/seek when available.
+        files = {"video": (filename, stream, "video/mp4")}
+        # The endpoint reads the options from the query string, not form fields
+        params = dict(
+            resize=resize,
+            speed=speed,
+            fps=fps,
+            quality=quality,  
+            loop=loop
+        )
+        
+        endpoint = self._ep["file_to_gif"]
+        
+        if save_to:
+            return self._download("POST", endpoint, save_to, "GIF", chunk_size, files=files, params=params, headers=_BINARY_HEADERS)
+        
+        response = self.client.post(endpoint, files=files, params=params, headers=_BINARY_HEADERS)
+        response.raise_for_status()
+        return response.content
+
+
+class AsyncVideoServicesClient(_BaseClient):
+    """
+    Async client for the Video Services API.
+    
+    Use this to run independent requests (e.g. one pipeline per post URL)
+    concurrently on a single event loop instead of one after another.
+    """
+    
+    def __init__(
+        self, 
+        config: Optional[Config] = None,
+        base_url: Optional[str] = None,
+        auth: Optional[tuple[str, str]] = None,
+        timeout: Optional[float] = None,
+        max_connections: int = 64,
+        max_keepalive_connections: int = 32,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        http2: bool = HTTP2_AVAILABLE,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_cache_bytes: int = DEFAULT_MAX_CACHE_BYTES
+    ):
+        """
+        Initialize the client.
+        
+        Args:
+            config: Configuration object (uses default config if None)
+            base_url: Override base URL from config
+            auth: Override auth from config
+            timeout: Override timeout from config
+            max_connections: Maximum number of concurrent connections
+            max_keepalive_connections: Maximum number of idle connections kept in the pool
+            keepalive_expiry: Seconds an idle connection is kept open for reuse
+            http2: Negotiate HTTP/2 so concurrent requests share one connection
+                (defaults to True when the h2 package is installed)
+            cache_dir: Directory for caching clip/GIF results on disk (disabled if None)
+            max_cache_bytes: Size above which the oldest cached results are evicted
+        """
+        super().__init__(
+            config=config,
+            base_url=base_url,
+            auth=auth,
+            timeout=timeout,
+            cache_dir=cache_dir,
+            max_cache_bytes=max_cache_bytes
+        )
+        
+        self.client = httpx.AsyncClient(
+            auth=self.auth,
+            timeout=self.timeout,
+            follow_redirects=True,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
             )
+        )
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):  # type: ignore[no-untyped-def]
+        await self.client.aclose()
+    
+    async def _download(
+        self,
+        method: str,
+        url: str,
+        save_to: Union[str, Path],
+        label: str,
+        chunk_size: int,
+        **kwargs: Any
+    ) -> Path:
+        """Stream a response body straight to disk without buffering it in memory."""
+        save_path = self._prepare_output_path(save_to)
+        async with self.client.stream(method, url, **kwargs) as response:
+            response.raise_for_status()
+            with _atomic_output(save_path) as f:
+                _preallocate(f, response)
+                async for chunk in response.aiter_bytes(chunk_size=chunk_size):
+                    # Keep blocking disk writes off the event loop
+                    await asyncio.to_thread(f.write, chunk)
+        print(f"Saved {label} to: {save_path}")
+        return save_path
+    
+    async def health_check(self, use_cache: bool = True) -> Any:
+        """Check if the API is healthy (cached for HEALTH_CACHE_TTL seconds unless ``use_cache`` is False)."""
+        if use_cache:
+            cached = self._get_cached_response("health", HEALTH_CACHE_TTL)
+            if cached is not None:
+                return cached
+        
+        try:
+            response = await self.client.get(self._ep["health"])
+            response.raise_for_status()
+        except Exception:
+            self._response_cache.pop("health", None)
+            raise
+        
+        data = _json_loads(response.content)
+        self._response_cache["health"] = (time.monotonic(), data)
+        return data
+    
+    async def get_api_info(self, use_cache: bool = True) -> Any:
+        """Get API information and available endpoints (cached for API_INFO_CACHE_TTL seconds)."""
+        if use_cache:
+            cached = self._get_cached_response("info", API_INFO_CACHE_TTL)
+            if cached is not None:
+                return cached
+        
+        try:
+            response = await self.client.get(self._ep["root"])
+            response.raise_for_status()
+        except Exception:
+            self._response_cache.pop("info", None)
+            raise
+        
+        data = _json_loads(response.content)
+        self._response_cache["info"] = (time.monotonic(), data)
+        return data
+    
+    async def extract_video_url(self, url: str, use_cache: bool = True) -> str:
+        """
+        Extract direct video URL from a social media post URL.
+        
+        Args:
+            url: Social media post URL (X.com, LinkedIn, etc.)
+            use_cache: Reuse a URL this client already extracted instead of asking the server again
+            
+        Returns:
+            Direct video URL string
+            
+        Raises:
+            httpx.HTTPStatusError: If the request fails
+        """
+        if use_cache:
+            cached = self._get_cached_extract(url)
+            if cached is not None:
+                return cached
         
+        response = await self.client.get(
+            self._ep["extract"],
+            params={"url": url}
+        )
         response.raise_for_status()
         
-        gif_bytes = response.content
+        video_url = _decode_video_url(response.content)
+        self._cache_extract(url, video_url)
+        return video_url
+    
+    async def clip_video(
+        self, 
+        url: str, 
+        start_time: float, 
+        end_time: float,
+        save_to: Optional[Union[str, Path]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        accurate: bool = True
+    ) -> Union[bytes, Path]:
+        """
+        Clip a video between specified timestamps.
+        
+        Args:
+            url: Video URL or social media post URL. Post URLs are resolved
+                server-side, so there is no need to call extract_video_url first.
+            start_time: Start time in seconds
+            end_time: End time in seconds  
+            save_to: Optional path to stream the clipped video to
+            chunk_size: Read size in bytes when streaming to ``save_to``
+            accurate: Frame-exact cuts (server re-encodes around them); False
+                stream-copies from the nearest keyframes, which is much faster
+            
+        Returns:
+            Video bytes, or the path of the saved file if ``save_to`` is given
+            
+        Raises:
+            httpx.HTTPStatusError: If the request fails
+        """
+        endpoint = self._ep["clip"]
+        params = {
+            "url": url,
+            "start_time": start_time,
+            "end_time": end_time,
+            "accurate": accurate
+        }
+        
+        cache_path = self._disk_cache_path("clip", url, start_time, end_time, accurate)
+        if cache_path is not None:
+            cached = await asyncio.to_thread(self._load_from_disk_cache, cache_path, save_to, "clipped video")
+            if cached is not None:
+                return cached
+        
+        if save_to:
+            result = await self._download("GET", endpoint, save_to, "clipped video", chunk_size, params=params, headers=_BINARY_HEADERS)
+        else:
+            response = await self.client.get(endpoint, params=params, headers=_BINARY_HEADERS)
+            response.raise_for_status()
+            result = response.content
+        
+        if cache_path is not None:
+            await asyncio.to_thread(self._store_in_disk_cache, cache_path, result)
+        return result
+    
+    async def url_to_gif(
+        self,
+        url: str,
+        start_time: float,
+        end_time: float,
+        resize: Literal["25%", "50%", "75%", "100%"] = "100%",
+        speed: Literal["0.5x", "1x", "2x", "4x"] = "1x", 
+        fps: int = 8,
+        quality: int = 75,
+        loop: Literal["forever", "once", "none"] = "forever",
+        save_to: Optional[Union[str, Path]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Union[bytes, Path]:
+        """
+        Convert video from URL to GIF with clipping and options.
+        
+        Args:
+            url: Video URL or social media post URL. Post URLs are resolved
+                server-side, so there is no need to call extract_video_url first.
+            start_time: Start time in seconds
+            end_time: End time in seconds
+            resize: Resize percentage 
+            speed: Speed multiplier
+            fps: Frames per second (3-10)
+            quality: GIF quality (0-100)
+            loop: Loop behavior
+            save_to: Optional path to stream the GIF to
+            chunk_size: Read size in bytes when streaming to ``save_to``
+            
+        Returns:
+            GIF bytes, or the path of the saved file if ``save_to`` is given
+            
+        Raises:
+            httpx.HTTPStatusError: If the request fails
+        """
+        request_url = _gif_url(self._ep["url_to_gif"], url, start_time, end_time, resize, speed, fps, quality, loop)
+        
+        cache_path = self._disk_cache_path("url_to_gif", request_url)
+        if cache_path is not None:
+            cached = await asyncio.to_thread(self._load_from_disk_cache, cache_path, save_to, "GIF")
+            if cached is not None:
+                return cached
         
         if save_to:
-            save_path = self._resolve_output_path(save_to)
-            save_path.parent.mkdir(parents=True, exist_ok=True)
-            save_path.write_bytes(gif_bytes)
-            print(f"Saved GIF to: {save_path}")
+            result = await self._download("GET", request_url, save_to, "GIF", chunk_size, headers=_BINARY_HEADERS)
+        else:
+            response = await self.client.get(request_url, headers=_BINARY_HEADERS)
+            response.raise_for_status()
+            result = response.content
+        
+        if cache_path is not None:
+            await asyncio.to_thread(self._store_in_disk_cache, cache_path, result)
+        return result
+    
+    async def make_gif_from_file(
+        self,
+        video_file: Union[str, Path],
+        resize: Literal["25%", "50%", "75%", "100%"] = "100%",
+        speed: Literal["0.5x", "1x", "2x", "4x"] = "1x",
+        fps: int = 8, 
+        quality: int = 75,
+        loop: Literal["forever", "once", "none"] = "forever",
+        save_to: Optional[Union[str, Path]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Union[bytes, Path]:
+        """
+        Convert uploaded video file to GIF.
         
-        return gif_bytes
+        Args:
+            video_file: Path to video file to upload
+            resize: Resize percentage
+            speed: Speed multiplier  
+            fps: Frames per second (3-10)
+            quality: GIF quality (0-100)
+            loop: Loop behavior
+            save_to: Optional path to stream the GIF to
+            chunk_size: Read size in bytes when streaming to ``save_to``
+            
+        Returns:
+            GIF bytes, or the path of the saved file if ``save_to`` is given
+            
+        Raises:
+            httpx.HTTPStatusError: If the request fails
+        """
+        video_path = Path(video_file)
+        if not video_path.exists():
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+        
+        cache_path = self._disk_cache_path(
+            "file_to_gif", *_file_cache_key(video_path), resize, speed, fps, quality, loop
+        )
+        if cache_path is not None:
+            cached = await asyncio.to_thread(self._load_from_disk_cache, cache_path, save_to, "GIF")
+            if cached is not None:
+                return cached
+        
+        with open(video_path, 'rb') as f:
+            result = await self.make_gif_from_stream(
+                f, video_path.name, resize, speed, fps, quality, loop, save_to, chunk_size
+            )
+        
+        if cache_path is not None:
+            await asyncio.to_thread(self._store_in_disk_cache, cache_path, result)
+        return result
+    
+    async def make_gif_from_stream(
+        self,
+        stream: BinaryIO,
+        filename: str = "video.mp4",
+        resize: Literal["25%", "50%", "75%", "100%"] = "100%",
+        speed: Literal["0.5x", "1x", "2x", "4x"] = "1x",
+        fps: int = 8, 
+        quality: int = 75,
+        loop: Literal["forever", "once", "none"] = "forever",
+        save_to: Optional[Union[str, Path]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Union[bytes, Path]:
+        """
+        Convert video data from a file-like object to GIF.
+        
+        Useful for chaining with ``clip_video`` without writing the clip to disk,
+        e.g. by wrapping the clip bytes in ``io.BytesIO``.
+        
+        Args:
+            stream: Binary file-like object with the video content
+            filename: File name reported to the server
+            resize: Resize percentage
+            speed: Speed multiplier  
+            fps: Frames per second (3-10)
+            quality: GIF quality (0-100)
+            loop: Loop behavior
+            save_to: Optional path to stream the GIF to
+            chunk_size: Read size in bytes when streaming to ``save_to``
+            
+        Returns:
+            GIF bytes, or the path of the saved file if ``save_to`` is given
+            
+        Raises:
+            httpx.HTTPStatusError: If the request fails
+        """
+        # Passing the stream (not its bytes) lets httpx send the multipart
+        # body in chunks, with Content-Length from fstat/seek when available.
+        files = {"video": (filename, stream, "video/mp4")}
+        # The endpoint reads the options from the query string, not form fields
+        params = dict(
+            resize=resize,
+            speed=speed,
+            fps=fps,
+            quality=quality,  
+            loop=loop
+        )
+        
+        endpoint = self._ep["file_to_gif"]
+        
+        if save_to:
+            return await self._download("POST", endpoint, save_to, "GIF", chunk_size, files=files, params=params, headers=_BINARY_HEADERS)
+        
+        response = await self.client.post(endpoint, files=files, params=params, headers=_BINARY_HEADERS)
+        response.raise_for_status()
+        return response.content
+    
+    async def batch_extract(
+        self,
+        urls: list[str],
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY
+    ) -> list[str]:
+        """
+        Extract direct video URLs for several post URLs concurrently.
+        
+        Args:
+            urls: Social media post URLs
+            concurrency: Maximum number of requests in flight at once
+            
+        Returns:
+            Direct video URLs, in the same order as ``urls``
+        """
+        return await _gather_limited(
+            (self.extract_video_url(u) for u in urls), concurrency
+        )
+    
+    async def batch_clip(
+        self,
+        specs: list[tuple[str, float, float]],
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY
+    ) -> list[bytes]:
+        """
+        Clip several videos concurrently.
+        
+        Args:
+            specs: ``(url, start_time, end_time)`` tuples
+            concurrency: Maximum number of requests in flight at once
+            
+        Returns:
+            Clipped video bytes, in the same order as ``specs``
+        """
+        return await _gather_limited(
+            (self.clip_video(url, start, end) for url, start, end in specs), concurrency
+        )
+    
+    async def batch_gif(
+        self,
+        urls: list[str],
+        start_time: float,
+        end_time: float,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        **options: Any
+    ) -> list[bytes]:
+        """
+        Convert several videos to GIFs concurrently with the same clip range and options.
+        
+        Args:
+            urls: Video URLs or social media post URLs
+            start_time: Start time in seconds
+            end_time: End time in seconds
+            concurrency: Maximum number of requests in flight at once
+            **options: Extra keyword arguments forwarded to ``url_to_gif``;
+                ``save_to`` is not accepted, since every GIF would be written
+                to the same file
+            
+        Returns:
+            GIF bytes, in the same order as ``urls``
+            
+        Raises:
+            TypeError: If ``save_to`` is passed in ``options``
+            httpx.HTTPStatusError: If a request fails
+        """
+        if "save_to" in options:
+            raise TypeError("batch_gif() does not accept save_to; save the returned bytes per URL instead")
+        return await _gather_limited(
+            (self.url_to_gif(u, start_time, end_time, **options) for u in urls),
+            concurrency
+        )
+
+
+async def _gather_limited(aws: Iterable[Awaitable[Any]], concurrency: int) -> list[Any]:
+    """Await ``aws`` concurrently with at most ``concurrency`` running at once, preserving order."""
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def _run(aw: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await aw
+    
+    return await asyncio.gather(*(_run(aw) for aw in aws))
 
 
 # Convenience functions for quick usage
@@ -280,40 +1117,87 @@ def create_client(
     return VideoServicesClient(config=config, **overrides)
 
 
+# Clients shared by the quick_* helpers, keyed by their resolved settings, so
+# repeated calls reuse pooled keep-alive connections instead of reconnecting.
+_CLIENT_CACHE: dict[tuple[Any, ...], VideoServicesClient] = {}
+
+
+def _get_shared_client(
+    config: Optional[Config] = None,
+    **overrides: Any
+) -> VideoServicesClient:
+    """Return a cached client for the given config and overrides, creating it on first use."""
+    settings = _BaseClient(
+        config=config,
+        base_url=overrides.get("base_url"),
+        auth=overrides.get("auth"),
+        timeout=overrides.get("timeout")
+    )
+    pool_options = tuple(sorted(
+        (k, v) for k, v in overrides.items() if k not in ("base_url", "auth", "timeout")
+    ))
+    key = (settings.base_url, settings.auth, settings.timeout, settings.config.default_output_dir, pool_options)
+    
+    client = _CLIENT_CACHE.get(key)
+    if client is None:
+        client = VideoServicesClient(config=config, **overrides)
+        _CLIENT_CACHE[key] = client
+    return client
+
+
+@atexit.register
+def _close_shared_clients() -> None:
+    """Close all clients created by the quick_* helpers."""
+    for client in _CLIENT_CACHE.values():
+        client.client.close()
+    _CLIENT_CACHE.clear()
+
+
 def quick_extract(url: str, config: Optional[Config] = None, **overrides: Any) -> str:
     """Quick video URL extraction."""
-    with create_client(config, **overrides) as client:
-        return client.extract_video_url(url)
+    return _get_shared_client(config, **overrides).extract_video_url(url)
 
 
 def quick_clip(
     url: str, 
     start_time: float, 
     end_time: float, 
-    save_to: Optional[str] = None,
+    save_to: Optional[Union[str, Path]] = None,
     config: Optional[Config] = None,
     **overrides: Any
-) -> bytes:
-    """Quick video clipping."""
-    with create_client(config, **overrides) as client:
-        return client.clip_video(url, start_time, end_time, save_to)
+) -> Union[bytes, Path]:
+    """Quick video clipping. Returns the saved path if ``save_to`` is given, else the bytes."""
+    return _get_shared_client(config, **overrides).clip_video(url, start_time, end_time, save_to)
 
 
 def quick_gif(
     url: str,
     start_time: float,
     end_time: float,
-    save_to: Optional[str] = None,
+    save_to: Optional[Union[str, Path]] = None,
     config: Optional[Config] = None,
     **options: Any
-) -> bytes:
-    """Quick GIF creation from URL."""
+) -> Union[bytes, Path]:
+    """Quick GIF creation from URL. Returns the saved path if ``save_to`` is given, else the bytes."""
     # Separate config overrides from gif options
     config_overrides = {k: v for k, v in options.items() if k in ['base_url', 'auth', 'timeout']}
     gif_options = {k: v for k, v in options.items() if k not in config_overrides}
     
-    with create_client(config, **config_overrides) as client:
-        return client.url_to_gif(url, start_time, end_time, save_to=save_to, **gif_options)
+    client = _get_shared_client(config, **config_overrides)
+    return client.url_to_gif(url, start_time, end_time, save_to=save_to, **gif_options)
+
+
+def quick_batch_extract(
+    urls: list[str],
+    config: Optional[Config] = None,
+    **overrides: Any
+) -> list[str]:
+    """Quick concurrent video URL extraction for several post URLs."""
+    async def _run() -> list[str]:
+        async with AsyncVideoServicesClient(config=config, **overrides) as client:
+            return await client.batch_extract(urls)
+    
+    return asyncio.run(_run())
 
 
 # Example usage for interactive sessions
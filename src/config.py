@@ -40,48 +40,91 @@ class Config:
         if env_file is None:
             env_file = ".env"
         
-        env_path = Path(env_file)
-        if env_path.exists():
-            load_dotenv(env_path)
+        _load_dotenv_once(Path(env_file))
         
+        environ = os.environ
         return cls(
-            base_url=os.getenv("VIDEO_API_BASE_URL", "http://localhost:8000"),
-            timeout=float(os.getenv("VIDEO_API_TIMEOUT", "60.0")),
-            username=os.getenv("VIDEO_API_USERNAME"),
-            password=os.getenv("VIDEO_API_PASSWORD"),
-            default_output_dir=os.getenv("VIDEO_API_OUTPUT_DIR", "."),
+            base_url=environ.get("VIDEO_API_BASE_URL", "http://localhost:8000"),
+            timeout=float(environ.get("VIDEO_API_TIMEOUT", "60.0")),
+            username=environ.get("VIDEO_API_USERNAME"),
+            password=environ.get("VIDEO_API_PASSWORD"),
+            default_output_dir=environ.get("VIDEO_API_OUTPUT_DIR", "."),
         )
 
 
+# .env files already applied by Config.from_env: path -> mtime of the applied version
+_loaded_env_files: dict[Path, int] = {}
+
+# Variables Config.from_env set from a .env file, with the value it set
+_dotenv_values: dict[str, str] = {}
+
+
+def _load_dotenv_once(env_path: Path) -> None:
+    """
+    Apply a .env file unless this exact version of it was already applied.
+    
+    When the file changes, variables that came from an earlier version are
+    updated to the new values; variables set any other way still take
+    precedence over the file.
+    """
+    try:
+        path = env_path.resolve()
+        mtime = env_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return
+    
+    if _loaded_env_files.get(path) == mtime:
+        return
+    
+    for key, value in _parse_dotenv(env_path).items():
+        current = os.environ.get(key)
+        if current is None or current == _dotenv_values.get(key):
+            os.environ[key] = value
+            _dotenv_values[key] = value
+    _loaded_env_files[path] = mtime
+
+
 def load_dotenv(env_path: Path) -> None:
     """
     Simple .env file loader without external dependencies.
     
+    Variables already set in the environment take precedence over the file.
+    A missing file is ignored.
+    
     Args:
         env_path: Path to the .env file
     """
-    if not env_path.exists():
-        return
+    for key, value in _parse_dotenv(env_path).items():
+        # Set environment variable unless it is already defined
+        os.environ.setdefault(key, value)
+
+
+def _parse_dotenv(env_path: Path) -> dict[str, str]:
+    """Read the KEY=VALUE pairs of a .env file; a missing file yields no pairs."""
+    values: dict[str, str] = {}
+    try:
+        f = open(env_path, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        return values
     
-    with open(env_path, 'r', encoding='utf-8') as f:
+    with f:
         for line in f:
             line = line.strip()
             
             # Skip empty lines and comments
-            if not line or line.startswith('#'):
+            if not line or line[0] == '#':
                 continue
             
             # Parse KEY=VALUE format
-            if '=' in line:
-                key, value = line.split('=', 1)
-                key = key.strip()
-                value = value.strip()
-                
-                # Remove quotes if present
-                if value.startswith('"') and value.endswith('"'):
-                    value = value[1:-1]
-                elif value.startswith("'") and value.endswith("'"):
-                    value = value[1:-1]
-                
-                # Set environment variable
-                os.environ[key] = value
\ No newline at end of file
+            key, sep, value = line.partition('=')
+            if not sep:
+                continue
+            value = value.strip()
+            
+            # Remove matching quotes if present
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'"):
+                value = value[1:-1]
+            
+            # The first definition of a key wins, as with setdefault
+            values.setdefault(key.strip(), value)
+    return values
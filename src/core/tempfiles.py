@@ -0,0 +1,29 @@
+import os
+from typing import Optional
+
+
+# RAM-backed directory preferred for temporary inputs of known size
+SHM_DIR = "/dev/shm"
+
+
+def temp_dir(required_bytes: Optional[int] = None) -> Optional[str]:
+    """
+    Pick the directory for a temporary clip or GIF input file.
+
+    VIDEO_TMPDIR wins when set to a non-empty value. Otherwise returns SHM_DIR
+    when it is writable and has at least twice ``required_bytes`` free (Docker
+    sizes it at 64 MB by default), else None so tempfile falls back to the
+    default temp directory. An unknown size never goes to SHM_DIR.
+    """
+    override = os.getenv("VIDEO_TMPDIR")
+    if override:
+        return override
+    if required_bytes is None or not os.access(SHM_DIR, os.W_OK):
+        return None
+    try:
+        stats = os.statvfs(SHM_DIR)
+    except OSError:
+        return None
+    if stats.f_bavail * stats.f_frsize < 2 * required_bytes:
+        return None
+    return SHM_DIR
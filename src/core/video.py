@@ -1,17 +1,66 @@
 # pyright: reportUnknownMemberType=warning, reportUnknownVariableType=none, reportAttributeAccessIssue=warning
-from typing import Any, Dict
+from collections import OrderedDict
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
 
 import os
 import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
 import yt_dlp
 from yt_dlp.utils import download_range_func
 
+from .tempfiles import temp_dir
+
+
+# Resolved post URL -> media URL mappings are reused for a few minutes; the
+# platforms sign their CDN URLs with expiries well beyond that
+EXTRACT_CACHE_TTL = 300.0
+EXTRACT_CACHE_SIZE = 512
+
+# URLs whose path ends in one of these are already media files and are
+# returned as-is without running yt-dlp
+DIRECT_MEDIA_EXTENSIONS = frozenset({".mp4", ".m4v", ".mov", ".webm", ".mkv"})
+
+# Read size used when streaming a clipped video back to the caller
+CLIP_CHUNK_SIZE = 64 * 1024
+
+# Large info dict fields that clipping never needs, dropped before caching
+_INFO_CACHE_DROP_KEYS = ("automatic_captions", "subtitles", "thumbnails", "heatmap")
+
+# post URL -> (time cached, media URL, yt-dlp info dict)
+_extract_cache: "OrderedDict[str, Tuple[float, str, Dict[str, Any]]]" = OrderedDict()
+_extract_cache_lock = threading.Lock()
+
+# Per-URL locks for extractions in progress, so concurrent requests for the
+# same post wait for one yt-dlp run instead of each starting their own
+_extract_inflight: Dict[str, threading.Lock] = {}
+
+EXTRACT_YDL_OPTS: Dict[str, Any] = {
+    "quiet": True,
+    "no_warnings": True,
+    "extract_flat": False,
+    "no_download": True,
+}
+
+# One long-lived extractor per worker thread, so repeated extractions reuse
+# yt-dlp's keep-alive connections instead of a fresh TLS handshake each time.
+# YoutubeDL is not safe to share between threads, and a thread-local avoids
+# serializing all extractions behind a lock.
+_ydl_local = threading.local()
+_ydl_generation = 0
 
 
 def extract_video_url(post_url: str) -> str:
     """
     Extract direct video URL from social media post URL using yt-dlp.
 
+    Successful extractions are cached for EXTRACT_CACHE_TTL seconds, so
+    repeated clip/GIF requests for the same post skip the scrape, and
+    concurrent calls for the same post share a single extraction. Direct
+    links to media files (see DIRECT_MEDIA_EXTENSIONS) are returned unchanged.
+
     Args:
         post_url: URL of the social media post (X.com, LinkedIn, etc.)
 
@@ -21,42 +70,118 @@ def extract_video_url(post_url: str) -> str:
     Raises:
         ValueError: If video URL cannot be extracted
     """
-    ydl_opts: Dict[str, Any] = {
-        "quiet": True,
-        "no_warnings": True,
-        "extract_flat": False,
-        "no_download": True,
-    }
+    if _is_direct_media_url(post_url):
+        return post_url
+
+    cached = _get_cached_extract(post_url)
+    if cached is not None:
+        return cached[0]
+
+    with _extract_cache_lock:
+        url_lock = _extract_inflight.setdefault(post_url, threading.Lock())
 
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl: # pyright: ignore[reportArgumentType]
-            info = ydl.extract_info(post_url, download=False)
-
-            if not info:
-                raise ValueError("Could not extract video information")
-
-            # Get the best video format URL
-            raw_url = info.get("url")
-            if raw_url:
-                return raw_url
-            elif "formats" in info:
-                formats = info.get("formats") or []
-                # Select best quality video
-                video_formats = [f for f in formats if f.get("vcodec") != "none"]
-                if video_formats:
-                    best_format = max(video_formats, key=lambda f: f.get("height", 0)) # pyright: ignore[reportUnknownLambdaType]
-                    return best_format["url"]  # pyright: ignore[reportIndexIssue]
-                else:
-                    # Fallback to any format
-                    return info["formats"][0]["url"]  # pyright: ignore[reportIndexIssue, reportOptionalSubscript]
-            else:
-                raise ValueError("No video URL found in extracted information")
+        with url_lock:
+            # Another thread may have finished the extraction while we waited
+            cached = _get_cached_extract(post_url)
+            if cached is not None:
+                return cached[0]
+            video_url, info = _resolve_video_url(post_url)
+            _cache_extract(post_url, video_url, info)
+            return video_url
+    finally:
+        with _extract_cache_lock:
+            if _extract_inflight.get(post_url) is url_lock:
+                del _extract_inflight[post_url]
+
+
+def _is_direct_media_url(url: str) -> bool:
+    """Whether an http(s) URL points straight at a media file."""
+    parsed = urlparse(url)
+    extension = os.path.splitext(parsed.path)[1].lower()
+    return parsed.scheme in ("http", "https") and extension in DIRECT_MEDIA_EXTENSIONS
+
+
+def clear_extract_cache() -> None:
+    """Forget all cached extract_video_url results and pooled extractors."""
+    global _ydl_generation
+    with _extract_cache_lock:
+        _extract_cache.clear()
+        _ydl_generation += 1
+
+
+def _get_cached_extract(post_url: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Return the cached media URL and info dict if younger than EXTRACT_CACHE_TTL."""
+    with _extract_cache_lock:
+        entry = _extract_cache.get(post_url)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= EXTRACT_CACHE_TTL:
+            del _extract_cache[post_url]
+            return None
+        _extract_cache.move_to_end(post_url)
+        return entry[1], entry[2]
+
+
+def _cache_extract(post_url: str, video_url: str, info: Dict[str, Any]) -> None:
+    """Remember an extraction, evicting the least recently used entry when full."""
+    info = {k: v for k, v in info.items() if k not in _INFO_CACHE_DROP_KEYS}
+    with _extract_cache_lock:
+        _extract_cache[post_url] = (time.monotonic(), video_url, info)
+        _extract_cache.move_to_end(post_url)
+        if len(_extract_cache) > EXTRACT_CACHE_SIZE:
+            _extract_cache.popitem(last=False)
+
+
+def _extractor() -> yt_dlp.YoutubeDL:
+    """Return this thread's extractor, creating it on first use or after clear_extract_cache."""
+    if getattr(_ydl_local, "generation", None) != _ydl_generation:
+        stale = getattr(_ydl_local, "ydl", None)
+        if stale is not None:
+            # Release its request handlers and keep-alive sockets now, not at GC
+            stale.close()
+        _ydl_local.ydl = yt_dlp.YoutubeDL(EXTRACT_YDL_OPTS)  # pyright: ignore[reportArgumentType]
+        _ydl_local.generation = _ydl_generation
+    return _ydl_local.ydl
+
+
+def _resolve_video_url(post_url: str) -> Tuple[str, Dict[str, Any]]:
+    """Run the yt-dlp extractor for a post URL (uncached); returns the media URL and info dict."""
+    try:
+        info = _extractor().extract_info(post_url, download=False)
+
+        if not info:
+            raise ValueError("Could not extract video information")
+
+        return _select_video_url(info), info
 
     except Exception as e:
         raise ValueError(f"Failed to extract video URL: {str(e)}")
 
 
-def clip_video(source_url: str, start_time: float, end_time: float) -> bytes:
+def _select_video_url(info: Dict[str, Any]) -> str:
+    """Pick the media URL from an extracted info dict."""
+    # Get the best video format URL
+    raw_url = info.get("url")
+    if raw_url:
+        return raw_url
+    elif "formats" in info:
+        formats = info.get("formats") or []
+        # Select best quality video
+        video_formats = [f for f in formats if f.get("vcodec") != "none"]
+        if video_formats:
+            best_format = max(video_formats, key=lambda f: f.get("height", 0)) # pyright: ignore[reportUnknownLambdaType]
+            return best_format["url"]  # pyright: ignore[reportIndexIssue]
+        else:
+            # Fallback to any format
+            return info["formats"][0]["url"]  # pyright: ignore[reportIndexIssue, reportOptionalSubscript]
+    else:
+        raise ValueError("No video URL found in extracted information")
+
+
+def clip_video(
+    source_url: str, start_time: float, end_time: float, accurate: bool = True
+) -> bytes:
     """
     Download and clip a video between specified timestamps using yt-dlp.
 
@@ -64,6 +189,10 @@ def clip_video(source_url: str, start_time: float, end_time: float) -> bytes:
         source_url: Source URL (either social media post URL or direct video URL)
         start_time: Start time in seconds
         end_time: End time in seconds
+        accurate: Re-encode around the cuts so the clip starts and ends exactly
+            at the requested times. When False the streams are copied without
+            re-encoding, which is much faster but snaps the cuts to the
+            nearest keyframes (often a few seconds off).
 
     Returns:
         Clipped video as bytes
@@ -71,13 +200,104 @@ def clip_video(source_url: str, start_time: float, end_time: float) -> bytes:
     Raises:
         ValueError: If video cannot be downloaded or clipped
     """
+    temp_output_path = _download_clip(source_url, start_time, end_time, accurate)
+
+    try:
+        # Read the clipped video
+        with open(temp_output_path, "rb") as f:
+            video_bytes = f.read()
+
+        return video_bytes
+
+    except Exception as e:
+        raise ValueError(f"Failed to clip video: {str(e)}")
+
+    finally:
+        # Clean up temporary files
+        if os.path.exists(temp_output_path):
+            os.unlink(temp_output_path)
+
+
+def clip_video_stream(
+    source_url: str,
+    start_time: float,
+    end_time: float,
+    accurate: bool = True,
+    chunk_size: int = CLIP_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Download and clip a video, then stream it back in chunks.
+
+    The clip is downloaded eagerly, so any error is raised by this call rather
+    than while iterating; only reading the result is deferred. Memory use is
+    bounded by ``chunk_size`` instead of the clip size.
+
+    Args:
+        source_url: Source URL (either social media post URL or direct video URL)
+        start_time: Start time in seconds
+        end_time: End time in seconds
+        accurate: Frame-exact cuts (see clip_video)
+        chunk_size: Number of bytes yielded per chunk
+
+    Returns:
+        Iterator over the clipped video bytes
+
+    Raises:
+        ValueError: If video cannot be downloaded or clipped
+    """
+    temp_output_path = _download_clip(source_url, start_time, end_time, accurate)
+
+    try:
+        clip_file = open(temp_output_path, "rb")
+    except Exception as e:
+        raise ValueError(f"Failed to clip video: {str(e)}")
+    finally:
+        # The open handle keeps the data readable; unlinking now means the
+        # file is reclaimed even if the iterator is never consumed
+        if os.path.exists(temp_output_path):
+            os.unlink(temp_output_path)
+
+    return _iter_chunks(clip_file, chunk_size)
+
+
+def _iter_chunks(clip_file: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+    """Yield a file's contents in chunks, closing it when done."""
+    with clip_file:
+        while chunk := clip_file.read(chunk_size):
+            yield chunk
+
+
+def validate_time_range(start_time: float, end_time: float) -> None:
+    """
+    Check a clip range.
+
+    Raises:
+        ValueError: If the start is negative or the end is not after the start
+    """
     if start_time < 0:
         raise ValueError("Start time cannot be negative")
     if end_time <= start_time:
         raise ValueError("End time must be greater than start time")
 
-    # Create temporary file for output
-    temp_output_path = tempfile.mktemp(suffix=".mp4")
+
+def _download_clip(
+    source_url: str, start_time: float, end_time: float, accurate: bool
+) -> str:
+    """
+    Download the requested range with yt-dlp into a temporary file.
+
+    Returns:
+        Path of the clipped video; the caller is responsible for removing it
+
+    Raises:
+        ValueError: If the times are invalid or the download fails
+    """
+    validate_time_range(start_time, end_time)
+
+    # Reserve a unique output file (VIDEO_TMPDIR can point this at a tmpfs);
+    # yt-dlp reopens it by name, so only the path is kept
+    fd, temp_output_path = tempfile.mkstemp(suffix=".mp4", dir=temp_dir())
+    os.close(fd)
 
     try:
         # Use yt-dlp to download and clip the video in one step
@@ -85,24 +305,28 @@ def clip_video(source_url: str, start_time: float, end_time: float) -> bytes:
             "quiet": True,
             "no_warnings": True,
             "outtmpl": temp_output_path,
+            # The reserved file already exists; don't skip it as "already downloaded"
+            "overwrites": True,
             "format": "best[ext=mp4]/best",
             "download_ranges": download_range_func(None, [(start_time, end_time)]), # pyright: ignore[reportArgumentType]
-            "force_keyframes_at_cuts": True,
+            "force_keyframes_at_cuts": accurate,
         }
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:  # type: ignore[call-arg]
-            ydl.download([source_url])
-
-        # Read the clipped video
-        with open(temp_output_path, "rb") as f:
-            video_bytes = f.read()
+        cached = _get_cached_extract(source_url)
 
-        return video_bytes
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:  # type: ignore[call-arg]
+            if cached is None:
+                ydl.download([source_url])
+            else:
+                # Reuse the metadata from a recent extract_video_url call
+                # instead of scraping the post again (as --load-info-json does)
+                info = ydl.sanitize_info(cached[1], remove_private_keys=True)
+                ydl.process_ie_result(info, download=True)
 
     except Exception as e:
-        raise ValueError(f"Failed to clip video: {str(e)}")
-
-    finally:
         # Clean up temporary files
         if os.path.exists(temp_output_path):
             os.unlink(temp_output_path)
+        raise ValueError(f"Failed to clip video: {str(e)}")
+
+    return temp_output_path
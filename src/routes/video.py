@@ -1,39 +1,88 @@
+import asyncio
+import hashlib
 import traceback
 import os
-from fastapi import APIRouter, HTTPException, Response, Query, File, UploadFile
-from pydantic import BaseModel, HttpUrl
-from typing import Annotated, Literal
+from contextlib import contextmanager
+from fastapi import APIRouter, HTTPException, Response, Query, File, UploadFile, Header
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, HttpUrl
+from typing import Annotated, Any, Callable, Iterator, Literal, Optional, TypeVar
 
 from ..core import video, gif
 
 
 router = APIRouter(prefix="/api/video", tags=["video"])
 
+T = TypeVar("T")
 
-@router.get("/extract-url")
+# Upper bound on yt-dlp/ffmpeg jobs running at once; each one can saturate
+# several cores, so extra requests wait instead of oversubscribing the CPU.
+# Slots are awaited on the event loop, so queued jobs don't tie up the worker
+# threads that quick calls like extract-url also run on.
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS") or os.cpu_count() or 4)
+_job_slots = asyncio.Semaphore(MAX_CONCURRENT_JOBS)
+
+# Include tracebacks in error responses (read once; error paths stay cheap)
+_DEBUG = bool(os.getenv("DEBUG")) or os.getenv("ENVIRONMENT") == "development"
+
+
+@contextmanager
+def _http_errors() -> Iterator[None]:
+    """Map ValueError to 400 and anything else to 500, with tracebacks in debug mode."""
+    try:
+        yield
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=_error_detail(str(e)))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=_error_detail(f"Internal server error: {str(e)}")
+        )
+
+
+def _error_detail(message: str) -> str:
+    if _DEBUG:
+        return f"{message}\n\nTraceback:\n{traceback.format_exc()}"
+    return message
+
+
+async def _run_job(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking yt-dlp/ffmpeg call in a worker thread so the event loop stays free."""
+    async with _job_slots:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+
+@router.get("/extract-url", response_model=dict[str, str])
 async def extract_video_url_endpoint(
     url: HttpUrl = Query(..., description="Social media post URL"),
-) -> dict[str, str]:
+    if_none_match: Annotated[Optional[str], Header()] = None,
+) -> Response:
     """
     Extract direct video URL from a social media post URL.
 
     This endpoint takes a social media post URL (from X.com, LinkedIn, etc.)
     and returns the direct URL to the video file that can be downloaded.
+    Responses carry an ETag and may be cached for as long as the server
+    caches the extraction; a matching If-None-Match gets 304 Not Modified.
     """
-    try:
-        video_url = video.extract_video_url(str(url))
-        return {"video_url": video_url}
-            
-    except ValueError as e:
-        error_detail = str(e)
-        if os.getenv("DEBUG") or os.getenv("ENVIRONMENT") == "development":
-            error_detail = f"{error_detail}\n\nTraceback:\n{traceback.format_exc()}"
-        raise HTTPException(status_code=400, detail=error_detail)
-    except Exception as e:
-        error_detail = f"Internal server error: {str(e)}"
-        if os.getenv("DEBUG") or os.getenv("ENVIRONMENT") == "development":
-            error_detail = f"{error_detail}\n\nTraceback:\n{traceback.format_exc()}"
-        raise HTTPException(status_code=500, detail=error_detail)
+    with _http_errors():
+        video_url = await asyncio.to_thread(video.extract_video_url, str(url))
+
+    etag = '"' + hashlib.blake2b(video_url.encode(), digest_size=16).hexdigest() + '"'
+    headers = {
+        "Cache-Control": f"public, max-age={int(video.EXTRACT_CACHE_TTL)}",
+        "ETag": etag,
+    }
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse({"video_url": video_url}, headers=headers)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak If-None-Match comparison (RFC 9110), including the * wildcard."""
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag.removeprefix("W/") for tag in candidates)
 
 
 @router.get("/clip")
@@ -41,32 +90,30 @@ async def clip_video_endpoint(
     url: HttpUrl = Query(..., description="Video URL or social media post URL"),
     start_time: float = Query(..., description="Start time in seconds", ge=0),
     end_time: float = Query(..., description="End time in seconds", gt=0),
+    accurate: Annotated[
+        bool,
+        Query(description="Frame-exact cuts (re-encodes); false stream-copies from the nearest keyframes"),
+    ] = True,
 ) -> Response:
     """
     Clip a video between specified timestamps and return as binary data.
 
     This endpoint downloads a video from the provided URL, clips it between
     the start and end times (in seconds), and returns the clipped video as
-    binary data.
+    binary data. The clip is streamed from disk rather than held in memory.
     """
-    try:
-        video_bytes = video.clip_video(str(url), start_time, end_time)
+    with _http_errors():
+        # Reject bad ranges before waiting for a job slot
+        video.validate_time_range(start_time, end_time)
+        video_chunks = await _run_job(
+            video.clip_video_stream, str(url), start_time, end_time, accurate=accurate
+        )
 
-        return Response(
-            content=video_bytes,
+        return StreamingResponse(
+            video_chunks,
             media_type="video/mp4",
             headers={"Content-Disposition": "attachment; filename=clipped_video.mp4"},
         )
-    except ValueError as e:
-        error_detail = str(e)
-        if os.getenv("DEBUG") or os.getenv("ENVIRONMENT") == "development":
-            error_detail = f"{error_detail}\n\nTraceback:\n{traceback.format_exc()}"
-        raise HTTPException(status_code=400, detail=error_detail)
-    except Exception as e:
-        error_detail = f"Internal server error: {str(e)}"
-        if os.getenv("DEBUG") or os.getenv("ENVIRONMENT") == "development":
-            error_detail = f"{error_detail}\n\nTraceback:\n{traceback.format_exc()}"
-        raise HTTPException(status_code=500, detail=error_detail)
 
 
 class VideoToGifOptions(BaseModel):
@@ -80,17 +127,31 @@ class VideoToGifOptions(BaseModel):
     quality: int = 75
     loop: Literal["forever", "once", "none"] = "forever"
 
-@router.get("/to-gif/from-url")
-async def url_to_gif_endpoint(params: Annotated[VideoToGifOptions, Query()]
-) -> Response:
-    """
-    Convert video from URL to GIF with clipping and specified options.
 
-    This endpoint downloads a video from the provided URL, clips it between
-    the start and end times, and converts it to GIF format with customizable
-    options for resize, speed, fps, quality, and loop behavior.
-    """
+def _url_to_gif(params: VideoToGifOptions) -> bytes:
+    """Clip and convert a URL to GIF, preferring the single-pass ffmpeg path."""
+    # Extraction failures (bad or private posts) are final; retrying them
+    # through yt-dlp's clip path would just scrape the post again
+    video_url = video.extract_video_url(str(params.url))
+
+    # Fast path: ffmpeg reads just the requested range from the source and
+    # encodes the GIF in one pass, without an intermediate MP4 clip
     try:
+        gif_bytes = gif.from_url(
+            video_url,
+            params.start_time,
+            params.end_time,
+            resize=params.resize,
+            speed=params.speed,
+            fps=params.fps,
+            quality=params.quality,
+            loop=params.loop,
+        )
+    except ValueError:
+        # Some sources can't be read by ffmpeg directly (e.g. they need
+        # yt-dlp's request headers or stream merging); clip them via yt-dlp
+        if _DEBUG:
+            traceback.print_exc()
         video_bytes = video.clip_video(str(params.url), params.start_time, params.end_time)
 
         gif_bytes = gif.from_video(
@@ -102,37 +163,51 @@ async def url_to_gif_endpoint(params: Annotated[VideoToGifOptions, Query()]
             loop=params.loop,
         )
 
+    return gif_bytes
+
+
+@router.get("/to-gif/from-url")
+async def url_to_gif_endpoint(params: Annotated[VideoToGifOptions, Query()]
+) -> Response:
+    """
+    Convert video from URL to GIF with clipping and specified options.
+
+    This endpoint downloads a video from the provided URL, clips it between
+    the start and end times, and converts it to GIF format with customizable
+    options for resize, speed, fps, quality, and loop behavior.
+    """
+    with _http_errors():
+        # Reject bad options before any extraction or download starts
+        gif.validate_options(params.fps, params.quality)
+        video.validate_time_range(params.start_time, params.end_time)
+
+        gif_bytes = await _run_job(_url_to_gif, params)
+
         return Response(
             content=gif_bytes,
             media_type="image/gif",
             headers={"Content-Disposition": "attachment; filename=converted.gif"},
         )
-    except ValueError as e:
-        error_detail = str(e)
-        if os.getenv("DEBUG") or os.getenv("ENVIRONMENT") == "development":
-            error_detail = f"{error_detail}\n\nTraceback:\n{traceback.format_exc()}"
-        traceback.print_exc()
-        raise HTTPException(status_code=400, detail=error_detail)
-    except Exception as e:
-        error_detail = f"Internal server error: {str(e)}"
-        if os.getenv("DEBUG") or os.getenv("ENVIRONMENT") == "development":
-            error_detail = f"{error_detail}\n\nTraceback:\n{traceback.format_exc()}"
-        raise HTTPException(status_code=500, detail=error_detail)
-    
+
+
+def _gif_disposition(upload_name: Optional[str]) -> str:
+    """Content-Disposition naming the GIF after the uploaded file."""
+    stem = os.path.splitext(upload_name)[0] if upload_name else "video"
+    return f"attachment; filename={stem}.gif"
+
+
+class FileToGifOptions(BaseModel):
+    resize: Literal["25%", "50%", "75%", "100%"] = Field("100%", description="Resize percentage")
+    speed: Literal["0.5x", "1x", "2x", "4x"] = Field("1x", description="Speed multiplier")
+    fps: int = Field(8, description="Frames per second", ge=3, le=10)
+    quality: int = Field(75, description="GIF quality", ge=0, le=100)
+    loop: Literal["forever", "once", "none"] = Field("forever", description="Loop behavior")
+
+
 @router.post("/to-gif/from-file")
 async def file_to_gif(
     video: UploadFile = File(..., description="Video file to convert"),
-    resize: Literal["25%", "50%", "75%", "100%"] = Query(
-        "100%", description="Resize percentage"
-    ),
-    speed: Literal["0.5x", "1x", "2x", "4x"] = Query(
-        "1x", description="Speed multiplier"
-    ),
-    fps: int = Query(8, description="Frames per second", ge=3, le=10),
-    quality: int = Query(75, description="GIF quality", ge=0, le=100),
-    loop: Literal["forever", "once", "none"] = Query(
-        "forever", description="Loop behavior"
-    ),
+    params: Annotated[FileToGifOptions, Query()] = FileToGifOptions(),
 ) -> Response:
     """
     Convert uploaded video file to GIF with specified options.
@@ -140,34 +215,21 @@ async def file_to_gif(
     This endpoint accepts a video file upload and converts it to GIF format
     with customizable options for resize, speed, fps, quality, and loop behavior.
     """
-    try:
-        # Read video file content
-        video_bytes = await video.read()
-
-        # Convert to GIF
-        gif_bytes = gif.from_video(
-            video_bytes=video_bytes,
-            resize=resize,
-            speed=speed,
-            fps=fps,
-            quality=quality,
-            loop=loop,
+    with _http_errors():
+        # Convert to GIF, copying the upload's spooled file in chunks rather
+        # than reading it into memory
+        gif_bytes = await _run_job(
+            gif.from_file,
+            video_file=video.file,
+            resize=params.resize,
+            speed=params.speed,
+            fps=params.fps,
+            quality=params.quality,
+            loop=params.loop,
         )
 
         return Response(
             content=gif_bytes,
             media_type="image/gif",
-            headers={
-                "Content-Disposition": f"attachment; filename={video.filename.rsplit('.', 1)[0] if video.filename else 'video'}.gif"
-            },
+            headers={"Content-Disposition": _gif_disposition(video.filename)},
         )
-    except ValueError as e:
-        error_detail = str(e)
-        if os.getenv("DEBUG") or os.getenv("ENVIRONMENT") == "development":
-            error_detail = f"{error_detail}\n\nTraceback:\n{traceback.format_exc()}"
-        raise HTTPException(status_code=400, detail=error_detail)
-    except Exception as e:
-        error_detail = f"Internal server error: {str(e)}"
-        if os.getenv("DEBUG") or os.getenv("ENVIRONMENT") == "development":
-            error_detail = f"{error_detail}\n\nTraceback:\n{traceback.format_exc()}"
-        raise HTTPException(status_code=500, detail=error_detail)
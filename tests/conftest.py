@@ -1,24 +1,20 @@
+import os
 import pytest
+import shutil
 import tempfile
 from pathlib import Path
-from fastapi.testclient import TestClient
 import httpx
 
 from src.app import create_app
+from tests.fixtures.failure_log import FailureLogger
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def app():
-    """Create a test FastAPI application."""
+    """Create the test FastAPI application once for the whole session."""
     return create_app()
 
 
-@pytest.fixture
-def client(app):
-    """Create a test client for the FastAPI app."""
-    return TestClient(app)
-
-
 @pytest.fixture
 async def async_client(app):
     """Create an async test client for the FastAPI app."""
@@ -71,7 +67,7 @@ def sample_video_path():
 def mock_yt_dlp_success(mocker, mock_video_info):
     """Mock successful yt-dlp extraction."""
     mock_ydl = mocker.patch("yt_dlp.YoutubeDL")
-    mock_instance = mock_ydl.return_value.__enter__.return_value
+    mock_instance = mock_ydl.return_value
     mock_instance.extract_info.return_value = mock_video_info
     return mock_instance
 
@@ -100,21 +96,53 @@ def mock_ffmpeg_success(mocker):
     return mock_run
 
 
+CACHED_TEST_VIDEO = Path(__file__).parent / "fixtures" / "cached" / "blue_5s_320x240.mp4"
+
+
+@pytest.fixture(scope="session")
+def cached_test_video(tmp_path_factory):
+    """A real 5-second H.264 test video, committed to the repo and only ever read."""
+    if CACHED_TEST_VIDEO.exists():
+        return CACHED_TEST_VIDEO
+
+    # Never write into the source tree: pytest-xdist workers would race on it.
+    # Each worker gets its own basetemp, so encode a private copy there.
+    video_path = tmp_path_factory.mktemp("cached") / CACHED_TEST_VIDEO.name
+    try:
+        import ffmpeg as typed_ffmpeg
+
+        (
+            typed_ffmpeg.input("color=c=blue:s=320x240:d=5", f="lavfi")
+            .output(str(video_path), vcodec="libx264", pix_fmt="yuv420p")
+            .overwrite_output()
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+    except Exception as e:
+        pytest.skip(f"FFmpeg not available or failed: {e}")
+    return video_path
+
+
 @pytest.fixture
-def create_test_video(temp_dir):
-    """Create a simple test video file."""
+def create_test_video(temp_dir, cached_test_video):
+    """Copy the cached test video into the test's temp dir."""
 
-    def _create_video(filename="test_video.mp4", duration=5):
+    def _create_video(filename="test_video.mp4"):
         video_path = temp_dir / filename
-        # Create a minimal valid MP4 file header
-        # This is a simplified MP4 that most parsers will recognize
-        mp4_header = b"\x00\x00\x00\x20ftypmp42\x00\x00\x00\x00mp42isom"
-        video_path.write_bytes(mp4_header + b"\x00" * 1000)  # Add some dummy content
+        shutil.copy(cached_test_video, video_path)
         return str(video_path)
 
     return _create_video
 
 
+@pytest.fixture(scope="session")
+def failure_logger(tmp_path_factory):
+    """One error log per session (per worker under pytest-xdist)."""
+    worker = os.getenv("PYTEST_XDIST_WORKER", "main")
+    logger = FailureLogger(tmp_path_factory.mktemp("errors") / f"{worker}.log")
+    yield logger
+    logger.close()
+
+
 @pytest.fixture
 def vcr_config():
     """VCR configuration for recording HTTP interactions."""
@@ -126,3 +154,13 @@ def vcr_config():
         "filter_post_data_parameters": ["api_key"],
         "cassette_library_dir": "tests/fixtures/vcr_cassettes",
     }
+
+
+@pytest.fixture(autouse=True)
+def clear_extract_cache():
+    """Keep cached extract_video_url results from leaking between tests."""
+    from src.core.video import clear_extract_cache as _clear
+
+    _clear()
+    yield
+    _clear()
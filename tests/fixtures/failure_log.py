@@ -0,0 +1,23 @@
+"""
+Shared error log for tests that record failure details to a file.
+"""
+
+import traceback
+from pathlib import Path
+
+
+class FailureLogger:
+    """Appends exception tracebacks to a single log file."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, "a")
+
+    def record(self, exc: BaseException) -> Path:
+        self._file.writelines(traceback.format_exception(exc))
+        self._file.write("\n")
+        self._file.flush()
+        return self.path
+
+    def close(self) -> None:
+        self._file.close()
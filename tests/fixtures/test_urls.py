@@ -39,13 +39,14 @@ ACTIVE_TEST_URLS = [url for url in ALL_TEST_URLS if url.get("active", True)]
 
 PLATFORM_TYPE = Literal["linkedin", "x", "twitter", "youtube"]
 
+PLATFORM_URLS: Dict[str, List[TEST_LINK_TYPE]] = {
+    "linkedin": LINKEDIN_VIDEO_URLS,
+    "x": X_VIDEO_URLS,
+    "twitter": X_VIDEO_URLS,
+    "youtube": YOUTUBE_VIDEO_URLS,
+}
+
 
 def get_test_urls_by_platform(platform: PLATFORM_TYPE) -> List[TEST_LINK_TYPE]:
     """Get test URLs for a specific platform."""
-    platform_map = {
-        "linkedin": LINKEDIN_VIDEO_URLS,
-        "x": X_VIDEO_URLS,
-        "twitter": X_VIDEO_URLS,
-        "youtube": YOUTUBE_VIDEO_URLS,
-    }
-    return platform_map.get(platform.lower(), [])
+    return PLATFORM_URLS.get(platform.lower(), [])
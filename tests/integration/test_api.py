@@ -1,28 +1,29 @@
+import os
 import pytest
-import ffmpeg as typed_ffmpeg
-import tempfile
-import traceback
+import shutil
 
+from functools import partial
 from pathlib import Path
-from typing import Callable
+from typing import Any, Callable
 
-from httpx import AsyncClient
-from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
 
 
 @pytest.mark.integration
 class TestAPIIntegration:
     """Integration tests using real dependencies."""
 
-    def test_health_endpoint(self, client: TestClient) -> None:
+    @pytest.mark.asyncio
+    async def test_health_endpoint(self, async_client: AsyncClient) -> None:
         """Test health check endpoint."""
-        response = client.get("/health")
+        response = await async_client.get("/health")
         assert response.status_code == 200
         assert response.json() == {"status": "healthy"}
 
-    def test_root_endpoint(self, client: TestClient) -> None:
+    @pytest.mark.asyncio
+    async def test_root_endpoint(self, async_client: AsyncClient) -> None:
         """Test root endpoint returns API info."""
-        response = client.get("/")
+        response = await async_client.get("/")
         assert response.status_code == 200
         data = response.json()
         assert data["message"] == "Video Services API"
@@ -55,36 +56,40 @@ class TestAPIIntegration:
         assert "End time must be greater than start time" in response.json()["detail"]
 
 
+class LocalFileYDL:
+    """yt_dlp.YoutubeDL stand-in that "downloads" a local file."""
+
+    def __init__(self, source_path: str, opts: dict[str, Any]) -> None:
+        self.source_path = source_path
+        self.outtmpl = opts["outtmpl"]
+
+    def __enter__(self) -> "LocalFileYDL":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        pass
+
+    def download(self, urls: list[str]) -> None:
+        # Put the test file where yt-dlp would write; a hardlink avoids
+        # copying the bytes when both paths share a filesystem
+        try:
+            os.link(self.source_path, self.outtmpl)
+        except OSError:
+            shutil.copy(self.source_path, self.outtmpl)
+
+
 @pytest.mark.integration
 class TestVideoProcessingIntegration:
     """Integration tests with real ffmpeg but controlled video sources."""
 
     def test_clip_local_video_file(
-        self, create_test_video: Callable[[str], str], temp_dir: Path
+        self,
+        create_test_video: Callable[[str], str],
+        monkeypatch: pytest.MonkeyPatch,
     ) -> None:
         """Test clipping a local video file using real ffmpeg."""
-        # Create a test video
+        # Copy of the cached test video (encoded once, not on every run)
         test_video_path = create_test_video("test_input.mp4")
-        output_path = temp_dir / "output.mp4"
-
-        # Use real ffmpeg to create a simple test video
-        try:
-            (
-                typed_ffmpeg.input("color=c=blue:s=320x240:d=5", f="lavfi")
-                .output(test_video_path, vcodec="libx264", pix_fmt="yuv420p")  # type: ignore[arg-type,call-arg]
-                .overwrite_output()
-                .run(capture_stdout=True, capture_stderr=True)
-            )
-        except Exception as e:
-            # Log error details to file instead of console
-            error_log = tempfile.mktemp(suffix=".log", prefix="ffmpeg_error_")
-            with open(error_log, "w") as f:
-                f.write("FFmpeg error details:\n")
-                f.write(f"Exception: {str(e)}\n")
-                f.write(f"Exception type: {type(e)}\n")
-                traceback.print_exc(file=f)
-            print(f"FFmpeg error details written to: {error_log}")
-            pytest.skip(f"FFmpeg not available or failed: see {error_log}")
 
         # Now test clipping it
         from src.core.video import clip_video
@@ -92,35 +97,67 @@ class TestVideoProcessingIntegration:
         # Mock yt-dlp to skip download and use local file
         import yt_dlp
 
-        class MockYDL:
-            def __enter__(self):
-                return self
+        # monkeypatch restores yt_dlp.YoutubeDL afterwards (worker-safe under xdist)
+        monkeypatch.setattr(yt_dlp, "YoutubeDL", partial(LocalFileYDL, test_video_path))
 
-            def __exit__(self, *args: str) -> None:
-                pass
+        # This will use real ffmpeg for clipping
+        result = clip_video("https://example.com/local.mp4", 1.0, 3.0)
 
-            def download(self, urls: list[str]) -> None:
-                # Instead of downloading, just copy the test file
-                import shutil
+        assert len(result) > 0
+        # Check for MP4 file signature (more tolerant check)
+        assert result[:3] == b"\x00\x00\x00", (
+            f"Invalid MP4 header: {result[:8].hex()}"
+        )
 
-                shutil.copy(test_video_path, urls[0])
+    def test_gif_from_local_video_file(self, temp_dir: Path) -> None:
+        """Test converting a generated video to GIF using the real ffmpeg pipeline."""
+        import subprocess
+        import imageio_ffmpeg
+
+        from src.core.gif import from_video
+
+        test_video_path = temp_dir / "gif_input.mp4"
+        subprocess.run(
+            [
+                imageio_ffmpeg.get_ffmpeg_exe(),
+                "-f", "lavfi",
+                "-i", "testsrc=s=320x240:d=2:r=30",
+                "-pix_fmt", "yuv420p",
+                "-y",
+                str(test_video_path),
+            ],
+            capture_output=True,
+            check=True,
+        )
 
-        # Temporarily replace yt_dlp.YoutubeDL
-        original_ydl = yt_dlp.YoutubeDL
-        try:
-            yt_dlp.YoutubeDL = MockYDL  # type: ignore[assignment,misc]
+        result = from_video(test_video_path.read_bytes(), resize="50%", fps=5)
 
-            # This will use real ffmpeg for clipping
-            result = clip_video(str(output_path), 1.0, 3.0)
+        assert result[:6] == b"GIF89a"
+        # Logical screen size is stored little-endian right after the header
+        assert int.from_bytes(result[6:8], "little") == 160
+        assert int.from_bytes(result[8:10], "little") == 120
 
-            assert len(result) > 0
-            # Check for MP4 file signature (more tolerant check)
-            assert result[:3] == b"\x00\x00\x00", (
-                f"Invalid MP4 header: {result[:8].hex()}"
-            )
+        # The single-pass path clips while converting; it only accepts
+        # http(s) sources, so serve the video over a local HTTP server
+        import threading
+        from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 
+        from src.core.gif import from_url
+
+        server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), partial(SimpleHTTPRequestHandler, directory=str(temp_dir))
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            clipped = from_url(
+                f"http://127.0.0.1:{server.server_port}/{test_video_path.name}", 0.5, 1.5, fps=5
+            )
         finally:
-            yt_dlp.YoutubeDL = original_ydl  # type: ignore[misc]
+            server.shutdown()
+            server.server_close()
+
+        assert clipped[:6] == b"GIF89a"
+        assert len(clipped) < len(from_video(test_video_path.read_bytes(), fps=5))
 
     @pytest.mark.slow
     @pytest.mark.integration
@@ -174,3 +211,22 @@ class TestAPIErrorHandling:
         )
         assert response.status_code == 400
         # The exact error message depends on yt-dlp's behavior
+
+    @pytest.mark.asyncio
+    async def test_oversized_upload_is_rejected(self, mocker, monkeypatch) -> None:
+        """Test that uploads over MAX_UPLOAD_BYTES get 413 without being converted."""
+        import src.app
+
+        monkeypatch.setattr(src.app, "MAX_UPLOAD_BYTES", 1024)
+        mock_gif_from_file = mocker.patch("src.routes.video.gif.from_file")
+        transport = ASGITransport(app=src.app.create_app())
+
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/video/to-gif/from-file",
+                files={"video": ("big.mp4", b"x" * 2048, "video/mp4")},
+            )
+
+        assert response.status_code == 413
+        assert "Upload too large" in response.json()["detail"]
+        mock_gif_from_file.assert_not_called()
@@ -1,171 +1,127 @@
-import pytest
-import tempfile
 import os
-from unittest.mock import patch, MagicMock, mock_open
-import numpy as np
+import pytest
+import subprocess
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from src.core import gif
+from src.core.gif import from_file, from_url, from_video
+
+
+@pytest.fixture(autouse=True)
+def cpu_decode(monkeypatch):
+    """Decode on the CPU unless a test opts into hardware decoding."""
+    monkeypatch.setenv("FFMPEG_HWACCEL", "none")
+    monkeypatch.setattr(gif, "_hwaccel_broken", False)
+
+
+@pytest.fixture
+def mock_ffmpeg(mocker):
+    """Mock the ffmpeg subprocess used by from_video."""
+    mocker.patch("src.core.gif.imageio_ffmpeg.get_ffmpeg_exe", return_value="ffmpeg")
+    mock_run = mocker.patch("src.core.gif.subprocess.run")
+    mock_run.return_value = SimpleNamespace(returncode=0, stdout=b"fake gif bytes", stderr=b"")
+    return mock_run
 
-from src.core.gif import from_video
+
+def _ffmpeg_args(mock_run) -> list[str]:
+    """Return the argument list of the last ffmpeg invocation."""
+    return mock_run.call_args[0][0]
+
+
+def _filtergraph(mock_run) -> str:
+    """Return the -filter_complex value of the last ffmpeg invocation."""
+    args = _ffmpeg_args(mock_run)
+    return args[args.index("-filter_complex") + 1]
+
+
+def _input_path(mock_run) -> str:
+    """Return the input file passed to the last ffmpeg invocation."""
+    args = _ffmpeg_args(mock_run)
+    return args[args.index("-i") + 1]
 
 
 @pytest.mark.unit
 class TestGifFromVideo:
     """Unit tests for gif.from_video function with mocked dependencies."""
 
-    def test_from_video_success_basic(self, mocker):
+    def test_from_video_success_basic(self, mock_ffmpeg):
         """Test successful GIF conversion with default parameters."""
-        # Mock imageio v3 metadata
-        mock_metadata = {
-            'shape': [480, 720, 3],  # height, width, channels
-            'fps': 30.0
-        }
-        mocker.patch("src.core.gif.iio.immeta", return_value=mock_metadata)
-        
-        # Mock frames (simulate 3 frames)
-        mock_frames = [
-            np.random.randint(0, 255, (480, 720, 3), dtype=np.uint8),
-            np.random.randint(0, 255, (480, 720, 3), dtype=np.uint8),
-            np.random.randint(0, 255, (480, 720, 3), dtype=np.uint8),
-        ]
-        
-        # Mock imageio v3 imiter
-        mocker.patch("src.core.gif.iio.imiter", return_value=iter(mock_frames))
-        
-        # Mock imageio v3 imopen for writer
-        mock_writer = MagicMock()
-        mock_imopen = mocker.patch("src.core.gif.iio.imopen")
-        mock_imopen.return_value = mock_writer
-        
-        # Mock file operations
-        mock_builtin_open = mocker.patch("builtins.open", mock_open())
-        mock_builtin_open.return_value.read.return_value = b"fake gif bytes"
-        
-        # Mock tempfile
-        mocker.patch("tempfile.mktemp", side_effect=["/tmp/video.mp4", "/tmp/output.gif"])
-        
-        # Mock os.path.exists and os.unlink
-        mocker.patch("os.path.exists", return_value=True)
-        mock_unlink = mocker.patch("os.unlink")
-        
         video_bytes = b"fake video content"
         result = from_video(video_bytes)
-        
+
         assert result == b"fake gif bytes"
-        
-        # Verify file operations
-        mock_builtin_open.assert_any_call("/tmp/video.mp4", "wb")
-        mock_builtin_open.assert_any_call("/tmp/output.gif", "rb")
-        
-        # Verify cleanup
-        assert mock_unlink.call_count == 2
-        mock_unlink.assert_any_call("/tmp/video.mp4")
-        mock_unlink.assert_any_call("/tmp/output.gif")
-
-    def test_from_video_with_custom_parameters(self, mocker):
+
+        # Verify a single ffmpeg call does the whole conversion
+        mock_ffmpeg.assert_called_once()
+        args = _ffmpeg_args(mock_ffmpeg)
+        assert args[0] == "ffmpeg"
+        assert _input_path(mock_ffmpeg).endswith(".mp4")
+        assert args[-1] == "pipe:1"
+        assert args[args.index("-loop") + 1] == "0"
+        # Decoder threading options must come before the input
+        assert args.index("-thread_type") < args.index("-i")
+
+        graph = _filtergraph(mock_ffmpeg)
+        assert "trim=end_frame=1000" in graph
+        assert "fps=8" in graph
+        assert "palettegen=max_colors=196" in graph
+        assert "paletteuse" in graph
+        # Defaults neither retime nor resize
+        assert "setpts" not in graph
+        assert "scale=" not in graph
+
+        # Verify the temporary input file is removed
+        assert not os.path.exists(_input_path(mock_ffmpeg))
+
+    def test_from_video_with_custom_parameters(self, mock_ffmpeg):
         """Test GIF conversion with custom resize, speed, fps, quality, and loop parameters."""
-        # Mock imageio components
-        mock_reader = MagicMock()
-        mock_writer = MagicMock()
-        mock_properties = MagicMock()
-        mock_properties.shape = [480, 720, 3]
-        mock_properties.get.return_value = 30.0
-        mock_reader.properties.return_value = mock_properties
-        
-        # Mock frame that will be properly resized (50% of 720x480 = 360x240)
-        mock_frame = np.random.randint(0, 255, (480, 720, 3), dtype=np.uint8)
-        # Create properly sized resized frame for 50% resize
-        mock_resized_frame = np.random.randint(0, 255, (240, 360, 3), dtype=np.uint8)
-        mock_reader.__iter__ = MagicMock(return_value=iter([mock_frame]))
-        
-        # Mock PIL Image for resizing
-        mock_pil_image = MagicMock()
-        mock_resized_pil = MagicMock()
-        mock_pil_image.resize.return_value = mock_resized_pil
-        
-        mocker.patch("src.core.gif.Image.fromarray", return_value=mock_pil_image)
-        mocker.patch("src.core.gif.np.array", return_value=mock_resized_frame)
-        
-        mock_imopen = mocker.patch("src.core.gif.iio.imopen")
-        mock_imopen.side_effect = [mock_reader, mock_writer]
-        
-        mock_builtin_open = mocker.patch("builtins.open", mock_open())
-        mock_builtin_open.return_value.read.return_value = b"custom gif bytes"
-        
-        mocker.patch("tempfile.mktemp", side_effect=["/tmp/video.mp4", "/tmp/output.gif"])
-        mocker.patch("os.path.exists", return_value=True)
-        mocker.patch("os.unlink")
-        
-        video_bytes = b"fake video content"
         result = from_video(
-            video_bytes,
+            b"fake video content",
             resize="50%",
             speed="2x",
             fps=10,
             quality=90,
-            loop="once"
+            loop="once",
+        )
+
+        assert result == b"fake gif bytes"
+
+        graph = _filtergraph(mock_ffmpeg)
+        assert "setpts=PTS/2.0" in graph
+        assert "fps=10" in graph
+        assert "scale=iw*0.5:ih*0.5:flags=area" in graph
+        assert "palettegen=max_colors=232" in graph
+
+        args = _ffmpeg_args(mock_ffmpeg)
+        assert args[args.index("-loop") + 1] == "1"
+
+    def test_from_video_scale_kernel(self, mock_ffmpeg):
+        """Test that large downscales use area averaging and 75% keeps lanczos."""
+        from_video(b"fake video content", resize="25%")
+        assert "scale=iw*0.25:ih*0.25:flags=area" in _filtergraph(mock_ffmpeg)
+
+        from_video(b"fake video content", resize="75%")
+        assert "scale=iw*0.75:ih*0.75:flags=lanczos" in _filtergraph(mock_ffmpeg)
+
+    def test_from_video_filter_order(self, mock_ffmpeg):
+        """Test that frames are retimed and sampled before they are resized."""
+        from_video(b"fake video content", resize="25%", speed="0.5x")
+
+        graph = _filtergraph(mock_ffmpeg)
+        assert (
+            graph.index("trim=")
+            < graph.index("setpts=PTS/0.5")
+            < graph.index("fps=")
+            < graph.index("scale=iw*0.25")
+            < graph.index("palettegen")
         )
-        
-        assert result == b"custom gif bytes"
-        
-        # Verify writer.write was called with correct duration (100ms for 10fps) and loop=1
-        # We check the call args instead of exact frame match to avoid array comparison issues
-        assert mock_writer.write.called
-        call_args = mock_writer.write.call_args
-        assert call_args[1]["duration"] == 100
-        assert call_args[1]["loop"] == 1
-
-    def test_from_video_with_resize_using_pil(self, mocker):
-        """Test GIF conversion with resize that requires PIL processing."""
-        # Mock imageio components
-        mock_reader = MagicMock()
-        mock_writer = MagicMock()
-        mock_properties = MagicMock()
-        # Use dimensions that will require PIL (not evenly divisible)
-        mock_properties.shape = [480, 720, 3]  # 480x720
-        mock_properties.get.return_value = 30.0
-        mock_reader.properties.return_value = mock_properties
-        
-        # Create a frame
-        frame = np.random.randint(0, 255, (480, 720, 3), dtype=np.uint8)
-        mock_reader.__iter__ = MagicMock(return_value=iter([frame]))
-        
-        # For a 75% resize of 720x480, we get 540x360
-        # The numpy slicing approach will use step size 1/0.75 = 1.33...
-        # This doesn't result in clean slicing, so we need PIL
-        
-        # Mock PIL Image
-        mock_pil_image = MagicMock()
-        mock_resized_image = MagicMock()
-        mock_pil_image.resize.return_value = mock_resized_image
-        mock_resized_array = np.random.randint(0, 255, (360, 540, 3), dtype=np.uint8)
-        
-        mock_image_fromarray = mocker.patch("src.core.gif.Image.fromarray", return_value=mock_pil_image)
-        mock_np_array = mocker.patch("src.core.gif.np.array", return_value=mock_resized_array)
-        
-        mock_imopen = mocker.patch("src.core.gif.iio.imopen")
-        mock_imopen.side_effect = [mock_reader, mock_writer]
-        
-        mock_builtin_open = mocker.patch("builtins.open", mock_open())
-        mock_builtin_open.return_value.read.return_value = b"resized gif bytes"
-        
-        mocker.patch("tempfile.mktemp", side_effect=["/tmp/video.mp4", "/tmp/output.gif"])
-        mocker.patch("os.path.exists", return_value=True)
-        mocker.patch("os.unlink")
-        
-        video_bytes = b"fake video content"
-        result = from_video(video_bytes, resize="75%")
-        
-        assert result == b"resized gif bytes"
-        
-        # For 75% resize, PIL should be used since numpy slicing won't create exact dimensions
-        mock_image_fromarray.assert_called_once_with(frame)
-        mock_pil_image.resize.assert_called_once_with((540, 360), mocker.ANY)
-        mock_np_array.assert_called_once_with(mock_resized_image)
 
     def test_from_video_invalid_fps(self):
         """Test that invalid FPS values raise ValueError."""
         with pytest.raises(ValueError, match="FPS must be between 3 and 10"):
             from_video(b"fake video", fps=2)
-            
+
         with pytest.raises(ValueError, match="FPS must be between 3 and 10"):
             from_video(b"fake video", fps=11)
 
@@ -173,147 +129,249 @@ class TestGifFromVideo:
         """Test that invalid quality values raise ValueError."""
         with pytest.raises(ValueError, match="Quality must be between 0 and 100"):
             from_video(b"fake video", quality=-1)
-            
+
         with pytest.raises(ValueError, match="Quality must be between 0 and 100"):
             from_video(b"fake video", quality=101)
 
-    def test_from_video_exception_handling_and_cleanup(self, mocker):
+    def test_from_video_unsupported_option(self, mock_ffmpeg):
+        """Test that option values outside the supported sets raise ValueError."""
+        with pytest.raises(ValueError, match="Unsupported GIF option: 30%"):
+            from_video(b"fake video", resize="30%")  # type: ignore
+
+        with pytest.raises(ValueError, match="Unsupported GIF option: 3x"):
+            from_video(b"fake video", speed="3x")  # type: ignore
+
+        mock_ffmpeg.assert_not_called()
+
+    def test_from_video_exception_handling_and_cleanup(self, mock_ffmpeg):
         """Test that exceptions are properly handled and temp files are cleaned up."""
-        # Mock tempfile creation
-        mocker.patch("tempfile.mktemp", side_effect=["/tmp/video.mp4", "/tmp/output.gif"])
-        
-        # Mock file write to succeed
-        mock_builtin_open = mocker.patch("builtins.open", mock_open())
-        
-        # Mock imageio to raise an exception
-        mock_imopen = mocker.patch("src.core.gif.iio.imopen")
-        mock_imopen.side_effect = Exception("Imageio error")
-        
-        # Mock cleanup functions
-        mocker.patch("os.path.exists", return_value=True)
-        mock_unlink = mocker.patch("os.unlink")
-        
-        video_bytes = b"fake video content"
-        
-        with pytest.raises(ValueError, match="Failed to convert video to GIF: Imageio error"):
-            from_video(video_bytes)
-        
-        # Verify cleanup happened even with exception
-        assert mock_unlink.call_count == 2
-        mock_unlink.assert_any_call("/tmp/video.mp4")
-        mock_unlink.assert_any_call("/tmp/output.gif")
-
-    def test_from_video_speed_parameter_variations(self, mocker):
+        mock_ffmpeg.side_effect = Exception("ffmpeg error")
+
+        with pytest.raises(ValueError, match="Failed to convert video to GIF: ffmpeg error"):
+            from_video(b"fake video content")
+
+        # Verify cleanup still happens
+        assert not os.path.exists(_input_path(mock_ffmpeg))
+
+    def test_from_video_ffmpeg_failure(self, mock_ffmpeg):
+        """Test that a non-zero ffmpeg exit surfaces its stderr."""
+        mock_ffmpeg.return_value = SimpleNamespace(
+            returncode=1, stdout=b"", stderr=b"moov atom not found"
+        )
+
+        with pytest.raises(ValueError, match="ffmpeg failed with error: moov atom not found"):
+            from_video(b"fake video content")
+
+        assert not os.path.exists(_input_path(mock_ffmpeg))
+
+    def test_from_video_ffmpeg_timeout(self, mock_ffmpeg):
+        """Test that an ffmpeg timeout is reported as a conversion failure."""
+        mock_ffmpeg.side_effect = subprocess.TimeoutExpired(cmd="ffmpeg", timeout=300)
+
+        with pytest.raises(ValueError, match="ffmpeg command timed out"):
+            from_video(b"fake video content")
+
+    def test_from_video_empty_output(self, mock_ffmpeg):
+        """Test that an empty GIF output is treated as a failure."""
+        mock_ffmpeg.return_value = SimpleNamespace(returncode=0, stdout=b"", stderr=b"")
+
+        with pytest.raises(ValueError, match="No frames could be extracted from the video"):
+            from_video(b"fake video content")
+
+    @pytest.mark.parametrize(
+        "speed,expected_filter",
+        [
+            ("0.5x", "setpts=PTS/0.5"),
+            ("1x", None),
+            ("2x", "setpts=PTS/2.0"),
+            ("4x", "setpts=PTS/4.0"),
+        ],
+    )
+    def test_from_video_speed_parameter_variations(self, mock_ffmpeg, speed, expected_filter):
         """Test different speed parameter values."""
-        # Test different speed values
-        speed_tests = ["0.5x", "1x", "2x", "4x"]
-        
-        for speed in speed_tests:
-            # Mock imageio components for each iteration
-            mock_reader = MagicMock()
-            mock_writer = MagicMock()
-            mock_properties = MagicMock()
-            mock_properties.shape = [480, 720, 3]
-            mock_properties.get.return_value = 30.0  # 30 fps
-            mock_reader.properties.return_value = mock_properties
-            
-            # Create multiple frames to test frame stepping
-            mock_frames = [np.random.randint(0, 255, (480, 720, 3), dtype=np.uint8) for _ in range(10)]
-            mock_reader.__iter__ = MagicMock(return_value=iter(mock_frames))
-            
-            mock_imopen = mocker.patch("src.core.gif.iio.imopen")
-            mock_imopen.side_effect = [mock_reader, mock_writer]
-            
-            mock_builtin_open = mocker.patch("builtins.open", mock_open())
-            mock_builtin_open.return_value.read.return_value = b"speed test gif"
-            
-            mocker.patch("tempfile.mktemp", side_effect=["/tmp/video.mp4", "/tmp/output.gif"])
-            mocker.patch("os.path.exists", return_value=True)
-            mocker.patch("os.unlink")
-            
-            result = from_video(b"fake video", speed=speed, fps=8)  # type: ignore[arg-type]
-            assert result == b"speed test gif"
-            # Verify that writer.write was called (frames were processed)
-            assert mock_writer.write.called
-
-    def test_from_video_loop_parameter_variations(self, mocker):
+        from_video(b"fake video", speed=speed)  # type: ignore
+
+        graph = _filtergraph(mock_ffmpeg)
+        if expected_filter is None:
+            assert "setpts" not in graph
+        else:
+            assert expected_filter in graph
+
+    @pytest.mark.parametrize(
+        "loop_param,expected_loop", [("forever", "0"), ("once", "1"), ("none", "-1")]
+    )
+    def test_from_video_loop_parameter_variations(self, mock_ffmpeg, loop_param, expected_loop):
         """Test different loop parameter values."""
-        loop_tests = [
-            ("forever", 0),
-            ("once", 1),
-            ("none", None)
+        from_video(b"fake video", loop=loop_param)  # type: ignore
+
+        args = _ffmpeg_args(mock_ffmpeg)
+        assert args[args.index("-loop") + 1] == expected_loop
+
+
+@pytest.mark.unit
+class TestGifFromUrl:
+    """Unit tests for gif.from_url single-pass clip + conversion."""
+
+    def test_from_url_seeks_in_the_source(self, mock_ffmpeg):
+        """Test that the clip range is applied as input seeking on the remote URL."""
+        result = from_url(
+            "https://cdn.example.com/video.mp4", 2.0, 5.5, resize="50%", fps=10
+        )
+
+        assert result == b"fake gif bytes"
+        args = _ffmpeg_args(mock_ffmpeg)
+        assert args[args.index("-ss") + 1] == "2.0"
+        assert args[args.index("-to") + 1] == "5.5"
+        assert args.index("-ss") < args.index("-to") < args.index("-i")
+        assert args[args.index("-i") + 1] == "https://cdn.example.com/video.mp4"
+        assert args[args.index("-protocol_whitelist") + 1] == "http,https,tls,tcp,crypto"
+        assert args.index("-protocol_whitelist") < args.index("-i")
+        assert "fps=10" in _filtergraph(mock_ffmpeg)
+
+    @pytest.mark.parametrize(
+        "video_url", ["file:///etc/passwd", "concat:a.mp4|b.mp4", "/tmp/video.mp4"]
+    )
+    def test_from_url_rejects_non_http_urls(self, mock_ffmpeg, video_url):
+        """Test that only http(s) sources are handed to ffmpeg."""
+        with pytest.raises(ValueError, match="must be an http\\(s\\) URL"):
+            from_url(video_url, 0.0, 5.0)
+
+        mock_ffmpeg.assert_not_called()
+
+    def test_from_url_invalid_times(self, mock_ffmpeg):
+        """Test that invalid clip ranges are rejected before ffmpeg runs."""
+        with pytest.raises(ValueError, match="Start time cannot be negative"):
+            from_url("https://cdn.example.com/video.mp4", -1.0, 5.0)
+
+        with pytest.raises(ValueError, match="End time must be greater than start time"):
+            from_url("https://cdn.example.com/video.mp4", 5.0, 5.0)
+
+        mock_ffmpeg.assert_not_called()
+
+    def test_from_url_ffmpeg_failure(self, mock_ffmpeg):
+        """Test that unreadable sources raise ValueError with ffmpeg's stderr."""
+        mock_ffmpeg.return_value = SimpleNamespace(
+            returncode=1, stdout=b"", stderr=b"Server returned 403 Forbidden"
+        )
+
+        with pytest.raises(ValueError, match="403 Forbidden"):
+            from_url("https://cdn.example.com/video.mp4", 0.0, 5.0)
+
+
+@pytest.mark.unit
+class TestGifHwaccel:
+    """Unit tests for hardware-accelerated decoding with CPU fallback."""
+
+    @pytest.fixture(autouse=True)
+    def auto_hwaccel(self, monkeypatch, mocker):
+        monkeypatch.setenv("FFMPEG_HWACCEL", "auto")
+        return mocker.patch(
+            "src.core.gif._available_hwaccels", return_value=("vdpau", "vaapi", "cuda")
+        )
+
+    def test_hwaccel_prefers_cuda(self, mock_ffmpeg):
+        """Test that the preferred available decoder is passed before the input."""
+        from_video(b"fake video content")
+
+        args = _ffmpeg_args(mock_ffmpeg)
+        assert args[args.index("-hwaccel") + 1] == "cuda"
+        assert args.index("-hwaccel") < args.index("-i")
+
+    def test_hwaccel_unavailable(self, mock_ffmpeg, auto_hwaccel):
+        """Test that the CPU path is used when no preferred decoder is built in."""
+        auto_hwaccel.return_value = ("vdpau",)
+
+        from_video(b"fake video content")
+
+        assert "-hwaccel" not in _ffmpeg_args(mock_ffmpeg)
+
+    def test_hwaccel_explicit_method(self, mock_ffmpeg, monkeypatch):
+        """Test that FFMPEG_HWACCEL selects a specific decoder."""
+        monkeypatch.setenv("FFMPEG_HWACCEL", "vaapi")
+
+        from_video(b"fake video content")
+
+        args = _ffmpeg_args(mock_ffmpeg)
+        assert args[args.index("-hwaccel") + 1] == "vaapi"
+
+    def test_hwaccel_failure_falls_back_to_cpu(self, mock_ffmpeg):
+        """Test that a failed GPU decode is retried on the CPU and then disabled."""
+        mock_ffmpeg.side_effect = [
+            SimpleNamespace(returncode=1, stdout=b"", stderr=b"No device available"),
+            SimpleNamespace(returncode=0, stdout=b"fake gif bytes", stderr=b""),
+            SimpleNamespace(returncode=0, stdout=b"fake gif bytes", stderr=b""),
         ]
-        
-        for loop_value, expected_loop in loop_tests:
-            # Mock imageio components for each iteration
-            mock_reader = MagicMock()
-            mock_writer = MagicMock()
-            mock_properties = MagicMock()
-            mock_properties.shape = [480, 720, 3]
-            mock_properties.get.return_value = 30.0
-            mock_reader.properties.return_value = mock_properties
-            
-            mock_frame = np.random.randint(0, 255, (480, 720, 3), dtype=np.uint8)
-            mock_reader.__iter__ = MagicMock(return_value=iter([mock_frame]))
-            
-            mock_imopen = mocker.patch("src.core.gif.iio.imopen")
-            mock_imopen.side_effect = [mock_reader, mock_writer]
-            
-            mock_builtin_open = mocker.patch("builtins.open", mock_open())
-            mock_builtin_open.return_value.read.return_value = b"loop test gif"
-            
-            mocker.patch("tempfile.mktemp", side_effect=["/tmp/video.mp4", "/tmp/output.gif"])
-            mocker.patch("os.path.exists", return_value=True)
-            mocker.patch("os.unlink")
-            
-            result = from_video(b"fake video", loop=loop_value)  # type: ignore[arg-type]
-            assert result == b"loop test gif"
-            
-            # Verify the correct loop parameter was used
-            assert mock_writer.write.called
-            call_args = mock_writer.write.call_args
-            assert call_args[1]["duration"] == 125
-            assert call_args[1]["loop"] == expected_loop
-
-    def test_from_video_invalid_dimensions(self, mocker):
-        """Test that invalid video dimensions are handled properly."""
-        # Mock imageio components with invalid dimensions
-        mock_reader = MagicMock()
-        mock_properties = MagicMock()
-        mock_properties.shape = [0, 720, 3]  # Invalid height
-        mock_reader.properties.return_value = mock_properties
-        
-        mock_imopen = mocker.patch("src.core.gif.iio.imopen")
-        mock_imopen.return_value = mock_reader
-        
-        mock_builtin_open = mocker.patch("builtins.open", mock_open())
-        mocker.patch("tempfile.mktemp", side_effect=["/tmp/video.mp4", "/tmp/output.gif"])
-        mocker.patch("os.path.exists", return_value=True)
-        mocker.patch("os.unlink")
-        
-        video_bytes = b"fake video content"
-        
-        with pytest.raises(ValueError, match="Invalid video dimensions"):
-            from_video(video_bytes)
-
-    def test_from_video_missing_shape_attribute(self, mocker):
-        """Test that missing shape attribute is handled properly."""
-        # Mock imageio components without shape attribute
-        mock_reader = MagicMock()
-        mock_properties = MagicMock()
-        # Remove shape attribute
-        del mock_properties.shape
-        mock_reader.properties.return_value = mock_properties
-        
-        mock_imopen = mocker.patch("src.core.gif.iio.imopen")
-        mock_imopen.return_value = mock_reader
-        
-        mock_builtin_open = mocker.patch("builtins.open", mock_open())
-        mocker.patch("tempfile.mktemp", side_effect=["/tmp/video.mp4", "/tmp/output.gif"])
-        mocker.patch("os.path.exists", return_value=True)
-        mocker.patch("os.unlink")
-        
-        video_bytes = b"fake video content"
-        
-        with pytest.raises(ValueError, match="Unable to determine video dimensions"):
-            from_video(video_bytes)
\ No newline at end of file
+
+        assert from_video(b"fake video content") == b"fake gif bytes"
+        assert "-hwaccel" in mock_ffmpeg.call_args_list[0][0][0]
+        assert "-hwaccel" not in mock_ffmpeg.call_args_list[1][0][0]
+
+        from_video(b"fake video content")
+        assert mock_ffmpeg.call_count == 3
+        assert "-hwaccel" not in _ffmpeg_args(mock_ffmpeg)
+
+    def test_hwaccel_kept_when_input_is_bad(self, mock_ffmpeg):
+        """Test that a source error is raised without a CPU retry or disabling the GPU."""
+        mock_ffmpeg.return_value = SimpleNamespace(
+            returncode=1, stdout=b"", stderr=b"Server returned 403 Forbidden"
+        )
+
+        with pytest.raises(ValueError, match="403 Forbidden"):
+            from_url("https://cdn.example.com/video.mp4", 0.0, 5.0)
+
+        assert mock_ffmpeg.call_count == 1
+        assert gif._hwaccel_broken is False
+
+    @pytest.mark.parametrize(
+        "stderr",
+        [
+            b"Device creation failed: -542398533.",
+            b"Failed setup for format cuda: hwaccel initialisation returned error.",
+            b"Cannot load libcuda.so.1",
+        ],
+    )
+    def test_hwaccel_setup_errors_are_retried_on_cpu(self, mock_ffmpeg, stderr):
+        """Test that decoder setup failures are recognized from ffmpeg's stderr."""
+        mock_ffmpeg.side_effect = [
+            SimpleNamespace(returncode=1, stdout=b"", stderr=stderr),
+            SimpleNamespace(returncode=0, stdout=b"fake gif bytes", stderr=b""),
+        ]
+
+        assert from_video(b"fake video content") == b"fake gif bytes"
+        assert mock_ffmpeg.call_count == 2
+        assert gif._hwaccel_broken is True
+
+
+@pytest.mark.unit
+class TestGifFromFile:
+    """Unit tests for gif.from_file stream input."""
+
+    def test_from_file_copies_stream_to_temp_input(self, mock_ffmpeg, mocker):
+        """Test that the stream is copied into the ffmpeg input file."""
+        import io
+
+        copied = {}
+
+        def capture_input(cmd, **kwargs):
+            with open(cmd[cmd.index("-i") + 1], "rb") as f:
+                copied["input"] = f.read()
+            return SimpleNamespace(returncode=0, stdout=b"fake gif bytes", stderr=b"")
+
+        mock_ffmpeg.side_effect = capture_input
+        stream = io.BytesIO(b"header" + b"x" * 200_000)
+        stream.seek(6)
+
+        assert from_file(stream, fps=5) == b"fake gif bytes"
+        assert copied["input"] == b"x" * 200_000
+
+    def test_from_file_unknown_size_skips_shm(self, mock_ffmpeg, mocker):
+        """Test that unseekable streams are not written to /dev/shm."""
+        mock_access = mocker.patch("src.core.gif.os.access", return_value=True)
+        stream = MagicMock()
+        stream.tell.side_effect = OSError("not seekable")
+        stream.read.side_effect = [b"video", b""]
+
+        from_file(stream)
+
+        mock_access.assert_not_called()
+        assert not _input_path(mock_ffmpeg).startswith("/dev/shm")
@@ -0,0 +1,50 @@
+import pytest
+from types import SimpleNamespace
+
+from src.core.tempfiles import temp_dir
+
+
+@pytest.mark.unit
+class TestTempDir:
+    """Unit tests for choosing where temporary clip/GIF files are written."""
+
+    def test_temp_dir_uses_shm_when_it_has_room(self, mocker):
+        """Test that /dev/shm is used when writable with enough free space."""
+        mocker.patch("src.core.tempfiles.os.access", return_value=True)
+        mocker.patch(
+            "src.core.tempfiles.os.statvfs",
+            return_value=SimpleNamespace(f_bavail=1000, f_frsize=4096),
+        )
+
+        assert temp_dir(1000 * 4096 // 2) == "/dev/shm"
+
+    def test_temp_dir_falls_back_when_shm_is_too_small(self, mocker):
+        """Test fallback to the default temp dir when /dev/shm lacks space."""
+        mocker.patch("src.core.tempfiles.os.access", return_value=True)
+        mocker.patch(
+            "src.core.tempfiles.os.statvfs",
+            return_value=SimpleNamespace(f_bavail=1000, f_frsize=4096),
+        )
+
+        assert temp_dir(1000 * 4096) is None
+
+    def test_temp_dir_honours_video_tmpdir(self, mocker, monkeypatch):
+        """Test that VIDEO_TMPDIR overrides the /dev/shm heuristic."""
+        monkeypatch.setenv("VIDEO_TMPDIR", "/mnt/scratch")
+        mock_access = mocker.patch("src.core.tempfiles.os.access")
+
+        assert temp_dir(1) == "/mnt/scratch"
+        mock_access.assert_not_called()
+
+    def test_temp_dir_falls_back_when_shm_is_missing(self, mocker):
+        """Test fallback to the default temp dir when /dev/shm is not writable."""
+        mocker.patch("src.core.tempfiles.os.access", return_value=False)
+
+        assert temp_dir(1) is None
+
+    def test_temp_dir_ignores_empty_video_tmpdir(self, mocker, monkeypatch):
+        """Test that an empty VIDEO_TMPDIR means the default temp dir, not the cwd."""
+        monkeypatch.setenv("VIDEO_TMPDIR", "")
+        mocker.patch("src.core.tempfiles.os.access", return_value=False)
+
+        assert temp_dir() is None
@@ -1,7 +1,29 @@
+import io
 import pytest
-from unittest.mock import patch, MagicMock
-
-from src.core.video import extract_video_url, clip_video
+from types import SimpleNamespace
+
+from src.core.video import (
+    EXTRACT_CACHE_TTL,
+    clear_extract_cache,
+    extract_video_url,
+    clip_video,
+    clip_video_stream,
+)
+
+
+@pytest.fixture
+def clip_io_mocks(mocker, tmp_path):
+    """Mock the temp file handling around a clip download."""
+    # The reserved output file is real; os.unlink is mocked, so keep it in a
+    # directory pytest cleans up itself
+    mocker.patch("src.core.video.temp_dir", return_value=str(tmp_path))
+    return SimpleNamespace(
+        open=mocker.patch(
+            "builtins.open", side_effect=lambda *args, **kwargs: io.BytesIO(b"clipped video content")
+        ),
+        exists=mocker.patch("os.path.exists", return_value=False),
+        unlink=mocker.patch("os.unlink"),
+    )
 
 
 @pytest.mark.unit
@@ -32,7 +54,7 @@ class TestExtractVideoUrl:
         }
 
         mock_ydl = mocker.patch("yt_dlp.YoutubeDL")
-        mock_instance = mock_ydl.return_value.__enter__.return_value
+        mock_instance = mock_ydl.return_value
         mock_instance.extract_info.return_value = mock_info
 
         result = extract_video_url("https://linkedin.com/posts/123")
@@ -49,7 +71,7 @@ class TestExtractVideoUrl:
         }
 
         mock_ydl = mocker.patch("yt_dlp.YoutubeDL")
-        mock_instance = mock_ydl.return_value.__enter__.return_value
+        mock_instance = mock_ydl.return_value
         mock_instance.extract_info.return_value = mock_info
 
         result = extract_video_url("https://example.com/post")
@@ -60,7 +82,7 @@ class TestExtractVideoUrl:
     def test_extract_video_url_no_info(self, mocker):
         """Test extraction failure when no info is returned."""
         mock_ydl = mocker.patch("yt_dlp.YoutubeDL")
-        mock_instance = mock_ydl.return_value.__enter__.return_value
+        mock_instance = mock_ydl.return_value
         mock_instance.extract_info.return_value = None
 
         with pytest.raises(ValueError, match="Could not extract video information"):
@@ -71,7 +93,7 @@ class TestExtractVideoUrl:
         mock_info = {"title": "Video Title"}  # Info without URL or formats
 
         mock_ydl = mocker.patch("yt_dlp.YoutubeDL")
-        mock_instance = mock_ydl.return_value.__enter__.return_value
+        mock_instance = mock_ydl.return_value
         mock_instance.extract_info.return_value = mock_info
 
         with pytest.raises(ValueError, match="No video URL found"):
@@ -80,7 +102,7 @@ class TestExtractVideoUrl:
     def test_extract_video_url_yt_dlp_exception(self, mocker):
         """Test handling of yt-dlp exceptions."""
         mock_ydl = mocker.patch("yt_dlp.YoutubeDL")
-        mock_instance = mock_ydl.return_value.__enter__.return_value
+        mock_instance = mock_ydl.return_value
         mock_instance.extract_info.side_effect = Exception("Network error")
 
         with pytest.raises(
@@ -88,38 +110,116 @@ class TestExtractVideoUrl:
         ):
             extract_video_url("https://example.com/post")
 
+    def test_extract_video_url_is_cached(self, mock_yt_dlp_success, mocker):
+        """Test that repeated extractions reuse the cached result until it expires."""
+        mock_time = mocker.patch("src.core.video.time.monotonic", return_value=1000.0)
+
+        first = extract_video_url("https://x.com/user/status/123456")
+        second = extract_video_url("https://x.com/user/status/123456")
+
+        assert first == second == "https://example.com/video.mp4"
+        assert mock_yt_dlp_success.extract_info.call_count == 1
+
+        mock_time.return_value = 1000.0 + EXTRACT_CACHE_TTL
+        extract_video_url("https://x.com/user/status/123456")
+        assert mock_yt_dlp_success.extract_info.call_count == 2
+
+    def test_extract_video_url_failures_are_not_cached(self, mocker):
+        """Test that a failed extraction is retried on the next call."""
+        mock_ydl = mocker.patch("yt_dlp.YoutubeDL")
+        mock_instance = mock_ydl.return_value
+        mock_instance.extract_info.side_effect = [
+            Exception("Network error"),
+            {"url": "https://example.com/video.mp4"},
+        ]
+
+        with pytest.raises(ValueError):
+            extract_video_url("https://x.com/user/status/123456")
+
+        assert extract_video_url("https://x.com/user/status/123456") == "https://example.com/video.mp4"
+
+    def test_extract_video_url_concurrent_calls_share_extraction(self, mocker):
+        """Test that simultaneous requests for one post run yt-dlp only once."""
+        import threading
+
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_extract(url, download=False):
+            started.set()
+            release.wait(5)
+            return {"url": "https://example.com/video.mp4"}
+
+        mock_ydl = mocker.patch("yt_dlp.YoutubeDL")
+        mock_ydl.return_value.extract_info.side_effect = slow_extract
+
+        results = []
+        first = threading.Thread(
+            target=lambda: results.append(extract_video_url("https://x.com/user/status/1"))
+        )
+        first.start()
+        started.wait(5)
+        second = threading.Thread(
+            target=lambda: results.append(extract_video_url("https://x.com/user/status/1"))
+        )
+        second.start()
+        # Give the second call time to block on the in-flight extraction
+        second.join(0.1)
+        release.set()
+        first.join(5)
+        second.join(5)
+
+        assert results == ["https://example.com/video.mp4"] * 2
+        assert mock_ydl.return_value.extract_info.call_count == 1
+
+    def test_extract_video_url_direct_media_link(self, mocker):
+        """Test that direct media file URLs are returned without running yt-dlp."""
+        mock_ydl = mocker.patch("yt_dlp.YoutubeDL")
+        direct_url = "https://dms.licdn.com/playlist/vid/video_720p.MP4?e=1700000000&t=abc"
+
+        assert extract_video_url(direct_url) == direct_url
+        mock_ydl.assert_not_called()
+
+    def test_extract_video_url_reuses_extractor(self, mocker):
+        """Test that one YoutubeDL instance serves repeated extractions on a thread."""
+        mock_ydl = mocker.patch("yt_dlp.YoutubeDL")
+        mock_ydl.return_value.extract_info.return_value = {
+            "url": "https://example.com/video.mp4"
+        }
+
+        extract_video_url("https://x.com/user/status/1")
+        extract_video_url("https://x.com/user/status/2")
+
+        assert mock_ydl.call_count == 1
+        assert mock_ydl.return_value.extract_info.call_count == 2
+
+    def test_clear_extract_cache_closes_replaced_extractor(self, mocker):
+        """Test that the extractor dropped by clear_extract_cache is closed, not left to GC."""
+        first, second = mocker.MagicMock(), mocker.MagicMock()
+        for ydl in (first, second):
+            ydl.extract_info.return_value = {"url": "https://example.com/video.mp4"}
+        mocker.patch("yt_dlp.YoutubeDL", side_effect=[first, second])
+
+        extract_video_url("https://x.com/user/status/1")
+        clear_extract_cache()
+        extract_video_url("https://x.com/user/status/1")
+
+        first.close.assert_called_once_with()
+        second.close.assert_not_called()
+
 
 @pytest.mark.unit
 class TestClipVideo:
     """Unit tests for clip_video function with mocked dependencies."""
 
-    def test_clip_video_success(self, mocker, temp_dir):
+    def test_clip_video_success(self, mocker, clip_io_mocks):
         """Test successful video clipping."""
         # Mock yt-dlp download
         mock_ydl = mocker.patch("yt_dlp.YoutubeDL")
         mock_download = mock_ydl.return_value.__enter__.return_value.download
         mock_download.return_value = None
 
-        # Mock tempfile and file operations
-        with patch("tempfile.NamedTemporaryFile") as mock_temp:
-            # Setup temp files
-            temp_output = temp_dir / "output.mp4"
-            temp_output.write_bytes(b"clipped video content")
-
-            # Configure mock temporary file to return actual path
-            mock_temp_output = MagicMock()
-            mock_temp_output.name = str(temp_output)
-
-            mock_temp.return_value = mock_temp_output
-
-            with patch("builtins.open", create=True) as mock_open:
-                mock_open.return_value.__enter__.return_value.read.return_value = (
-                    b"clipped video content"
-                )
-
-                # Mock os.path.exists to return False so cleanup doesn't fail
-                with patch("os.path.exists", return_value=False):
-                    result = clip_video("https://example.com/video.mp4", 10.0, 20.0)
+        result = clip_video("https://example.com/video.mp4", 10.0, 20.0)
 
         assert result == b"clipped video content"
         mock_download.assert_called_once()
@@ -143,50 +243,81 @@ class TestClipVideo:
         ):
             clip_video("https://example.com/video.mp4", 10.0, 10.0)
 
-    def test_clip_video_download_failure(self, mocker, temp_dir):
+    def test_clip_video_keyframe_cuts(self, mocker, clip_io_mocks):
+        """Test that accurate controls whether yt-dlp re-encodes around the cuts."""
+        mock_ydl = mocker.patch("yt_dlp.YoutubeDL")
+
+        clip_video("https://example.com/video.mp4", 10.0, 20.0)
+        assert mock_ydl.call_args[0][0]["force_keyframes_at_cuts"] is True
+
+        clip_video("https://example.com/video.mp4", 10.0, 20.0, accurate=False)
+        assert mock_ydl.call_args[0][0]["force_keyframes_at_cuts"] is False
+
+    def test_clip_video_download_failure(self, mocker, clip_io_mocks):
         """Test handling of download failures."""
         mock_ydl = mocker.patch("yt_dlp.YoutubeDL")
         mock_instance = mock_ydl.return_value.__enter__.return_value
         mock_instance.download.side_effect = Exception("Download failed")
 
-        # Mock tempfile with proper cleanup
-        with patch("tempfile.NamedTemporaryFile") as mock_temp:
-            temp_output = temp_dir / "output.mp4"
+        with pytest.raises(ValueError, match="Failed to clip video: Download failed"):
+            clip_video("https://example.com/video.mp4", 0.0, 10.0)
 
-            mock_temp_output = MagicMock()
-            mock_temp_output.name = str(temp_output)
+    def test_clip_video_cleanup_on_error(self, mocker, clip_io_mocks):
+        """Test that temporary files are cleaned up on error."""
+        # Mock to raise an exception
+        mock_ydl = mocker.patch("yt_dlp.YoutubeDL")
+        mock_ydl.return_value.__enter__.return_value.download.side_effect = Exception(
+            "Error"
+        )
+        clip_io_mocks.exists.return_value = True
 
-            mock_temp.return_value = mock_temp_output
+        with pytest.raises(ValueError):
+            clip_video("https://example.com/video.mp4", 0.0, 10.0)
 
-            # Mock os.path.exists to return False so cleanup doesn't fail
-            with patch("os.path.exists", return_value=False):
-                with pytest.raises(
-                    ValueError, match="Failed to clip video: Download failed"
-                ):
-                    clip_video("https://example.com/video.mp4", 0.0, 10.0)
+        # Verify cleanup was attempted
+        assert clip_io_mocks.unlink.call_count == 1
 
-    def test_clip_video_cleanup_on_error(self, mocker, temp_dir):
-        """Test that temporary files are cleaned up on error."""
-        # Create actual temp file
-        temp_output = temp_dir / "output.mp4"
-        temp_output.write_text("test")
+    def test_clip_video_stream_yields_chunks(self, mocker, temp_dir):
+        """Test that the clip is streamed in chunks and the temp file is removed up front."""
+        mocker.patch("src.core.video.temp_dir", return_value=str(temp_dir))
+        mock_ydl = mocker.patch("yt_dlp.YoutubeDL")
 
-        # Mock to raise an exception
+        def download(urls):
+            with open(mock_ydl.call_args.args[0]["outtmpl"], "wb") as f:
+                f.write(b"0123456789")
+
+        mock_ydl.return_value.__enter__.return_value.download.side_effect = download
+
+        chunks = clip_video_stream(
+            "https://example.com/video.mp4", 0.0, 10.0, chunk_size=4
+        )
+
+        assert list(temp_dir.iterdir()) == []
+        assert list(chunks) == [b"0123", b"4567", b"89"]
+
+    def test_clip_video_stream_download_failure(self, mocker):
+        """Test that download errors are raised before any chunk is produced."""
         mock_ydl = mocker.patch("yt_dlp.YoutubeDL")
         mock_ydl.return_value.__enter__.return_value.download.side_effect = Exception(
-            "Error"
+            "Download failed"
         )
 
-        with patch("tempfile.NamedTemporaryFile") as mock_temp:
-            mock_temp.return_value = MagicMock(name=str(temp_output))
+        with pytest.raises(ValueError, match="Failed to clip video: Download failed"):
+            clip_video_stream("https://example.com/video.mp4", 0.0, 10.0)
 
-            # Mock os.path.exists and os.unlink to track cleanup
-            with patch("os.path.exists") as mock_exists:
-                with patch("os.unlink") as mock_unlink:
-                    mock_exists.return_value = True
+    def test_clip_video_reuses_cached_extraction(self, mocker, clip_io_mocks):
+        """Test that clipping a recently extracted post skips the second scrape."""
+        info = {"url": "https://example.com/video.mp4", "subtitles": {"en": []}}
+        mock_ydl = mocker.patch("yt_dlp.YoutubeDL")
+        mock_ydl.return_value.extract_info.return_value = info
+        mock_clip_ydl = mock_ydl.return_value.__enter__.return_value
+        mock_clip_ydl.sanitize_info.side_effect = lambda info, **kwargs: dict(info)
 
-                    with pytest.raises(ValueError):
-                        clip_video("https://example.com/video.mp4", 0.0, 10.0)
+        extract_video_url("https://x.com/user/status/1")
+        result = clip_video("https://x.com/user/status/1", 0.0, 5.0)
 
-                    # Verify cleanup was attempted
-                    assert mock_unlink.call_count == 1
+        assert result == b"clipped video content"
+        mock_clip_ydl.download.assert_not_called()
+        mock_clip_ydl.process_ie_result.assert_called_once_with(
+            {"url": "https://example.com/video.mp4"}, download=True
+        )
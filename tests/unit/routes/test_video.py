@@ -1,5 +1,11 @@
+import re
+import threading
+from io import BytesIO
+from types import SimpleNamespace
+from unittest.mock import DEFAULT, patch
+
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, UploadFile
 from pydantic import HttpUrl
 
 from src.routes.video import (
@@ -7,149 +13,226 @@ from src.routes.video import (
     clip_video_endpoint,
     url_to_gif_endpoint,
     file_to_gif,
+    FileToGifOptions,
     VideoToGifOptions,
 )
 
+URL_VIDEO_STR = "https://example.com/video.mp4"
+URL_X_STR = "https://x.com/user/status/123"
+URL_VIDEO = HttpUrl(URL_VIDEO_STR)
+URL_X = HttpUrl(URL_X_STR)
+URL_INVALID_DOMAIN = HttpUrl("https://invalid.com/post")
+URL_MISSING = HttpUrl("https://example.com/nonexistent.mp4")
+VIDEO_CONTENT = b"fake video content"
+
+# All tests here are unit tests. The handlers are awaited directly and leave
+# no tasks behind, so the tests share one event loop instead of one per test
+pytestmark = [pytest.mark.unit, pytest.mark.asyncio(loop_scope="module")]
+
+# (core error, expected status, expected detail) shared by the error-mapping tests
+ERROR_CASES = [
+    (ValueError("Invalid input"), 400, "Invalid input"),
+    (Exception("Unexpected error"), 500, "Internal server error: Unexpected error"),
+]
+ERROR_CASE_IDS = ["value_error", "generic_error"]
+
+
+@pytest.fixture
+def video_mocks():
+    """Patch the core functions the route handlers call."""
+    with patch.multiple(
+        "src.routes.video.video",
+        extract_video_url=DEFAULT,
+        clip_video_stream=DEFAULT,
+        clip_video=DEFAULT,
+    ) as core, patch.multiple(
+        "src.routes.video.gif", from_url=DEFAULT, from_video=DEFAULT, from_file=DEFAULT
+    ) as gifs:
+        yield SimpleNamespace(
+            extract_video_url=core["extract_video_url"],
+            clip_video_stream=core["clip_video_stream"],
+            clip_video=core["clip_video"],
+            gif_from_url=gifs["from_url"],
+            gif_from_video=gifs["from_video"],
+            gif_from_file=gifs["from_file"],
+        )
+
+
+@pytest.fixture
+def upload_factory():
+    """Build uploads for the file-to-GIF handler over one rewound in-memory buffer."""
+    buffer = BytesIO(VIDEO_CONTENT)
+
+    def _make(name: str = "test_video.mp4") -> UploadFile:
+        buffer.seek(0)
+        return UploadFile(filename=name, file=buffer)
+
+    return _make
+
+
+async def _read_body(response) -> bytes:
+    """Collect the chunks of a StreamingResponse."""
+    return b"".join([chunk async for chunk in response.body_iterator])
+
 
-@pytest.mark.unit
 class TestVideoRoutes:
     """Unit tests for video route handlers with mocked core functions."""
 
-    @pytest.mark.asyncio
-    async def test_extract_video_url_endpoint_success(self, mocker):
+    async def test_extract_video_url_endpoint_success(self, video_mocks):
         """Test successful video URL extraction endpoint."""
-        mock_extract = mocker.patch("src.routes.video.video.extract_video_url")
-        mock_extract.return_value = "https://example.com/extracted_video.mp4"
+        video_mocks.extract_video_url.return_value = "https://example.com/extracted_video.mp4"
 
-        url = HttpUrl("https://x.com/user/status/123")
-        response = await extract_video_url_endpoint(url=url)
+        response = await extract_video_url_endpoint(url=URL_X)
 
-        assert response["video_url"] == "https://example.com/extracted_video.mp4"
-        mock_extract.assert_called_once_with("https://x.com/user/status/123")
+        assert response.body == b'{"video_url":"https://example.com/extracted_video.mp4"}'
+        assert response.headers["Cache-Control"] == "public, max-age=300"
+        assert response.headers["ETag"].startswith('"')
+        video_mocks.extract_video_url.assert_called_once_with(URL_X_STR)
 
-    @pytest.mark.asyncio
-    async def test_extract_video_url_endpoint_value_error(self, mocker):
-        """Test extraction endpoint with ValueError from core function."""
-        mock_extract = mocker.patch("src.routes.video.video.extract_video_url")
-        mock_extract.side_effect = ValueError("Invalid URL format")
+    async def test_extract_video_url_endpoint_not_modified(self, video_mocks):
+        """Test that a matching If-None-Match gets 304 with no body."""
+        video_mocks.extract_video_url.return_value = "https://example.com/extracted_video.mp4"
 
-        url = HttpUrl("https://invalid.com/post")
+        first = await extract_video_url_endpoint(url=URL_X)
+        etag = first.headers["ETag"]
 
-        with pytest.raises(HTTPException) as exc_info:
-            await extract_video_url_endpoint(url=url)
+        response = await extract_video_url_endpoint(url=URL_X, if_none_match=f"W/{etag}")
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["ETag"] == etag
 
-        assert exc_info.value.status_code == 400
-        assert exc_info.value.detail == "Invalid URL format"
+        response = await extract_video_url_endpoint(url=URL_X, if_none_match='"stale"')
+        assert response.status_code == 200
 
-    @pytest.mark.asyncio
-    async def test_extract_video_url_endpoint_generic_error(self, mocker):
-        """Test extraction endpoint with generic exception."""
-        mock_extract = mocker.patch("src.routes.video.video.extract_video_url")
-        mock_extract.side_effect = Exception("Unexpected error")
+    async def test_clip_video_endpoint_runs_off_event_loop(self, video_mocks):
+        """Test that blocking clip work runs in a worker thread, not on the event loop."""
+        loop_thread = threading.get_ident()
+        worker_threads = []
 
-        url = HttpUrl("https://example.com/post")
+        def fake_clip(*args, **kwargs):
+            worker_threads.append(threading.get_ident())
+            return iter([b"clipped"])
 
-        with pytest.raises(HTTPException) as exc_info:
-            await extract_video_url_endpoint(url=url)
+        video_mocks.clip_video_stream.side_effect = fake_clip
 
-        assert exc_info.value.status_code == 500
-        assert "Internal server error" in exc_info.value.detail
+        response = await clip_video_endpoint(
+            url=URL_VIDEO, start_time=0.0, end_time=1.0
+        )
 
-    @pytest.mark.asyncio
-    async def test_clip_video_endpoint_success(self, mocker):
-        """Test successful video clipping endpoint."""
-        mock_clip = mocker.patch("src.routes.video.video.clip_video")
-        mock_clip.return_value = b"clipped video bytes"
+        assert await _read_body(response) == b"clipped"
+        assert worker_threads and worker_threads[0] != loop_thread
 
-        url = HttpUrl("https://example.com/video.mp4")
+    @pytest.mark.parametrize("error,status,detail", ERROR_CASES, ids=ERROR_CASE_IDS)
+    async def test_extract_video_url_endpoint_errors(self, video_mocks, error, status, detail):
+        """Test that extraction errors map to 400 (ValueError) or 500."""
+        video_mocks.extract_video_url.side_effect = error
+
+        with pytest.raises(HTTPException, match=re.escape(detail) + "$") as exc_info:
+            await extract_video_url_endpoint(url=URL_INVALID_DOMAIN)
+
+        assert exc_info.value.status_code == status
+
+    async def test_clip_video_endpoint_success(self, video_mocks):
+        """Test successful video clipping endpoint."""
+        video_mocks.clip_video_stream.return_value = iter([b"clipped ", b"video bytes"])
 
-        response = await clip_video_endpoint(url=url, start_time=10.0, end_time=20.0)
+        response = await clip_video_endpoint(url=URL_VIDEO, start_time=10.0, end_time=20.0)
 
-        assert response.body == b"clipped video bytes"
+        assert await _read_body(response) == b"clipped video bytes"
         assert response.media_type == "video/mp4"
         assert (
             response.headers["Content-Disposition"]
             == "attachment; filename=clipped_video.mp4"
         )
-        mock_clip.assert_called_once_with("https://example.com/video.mp4", 10.0, 20.0)
-
-    @pytest.mark.asyncio
-    async def test_clip_video_endpoint_invalid_times(self, mocker):
-        """Test clipping endpoint with invalid time parameters."""
-        mock_clip = mocker.patch("src.routes.video.video.clip_video")
-        mock_clip.side_effect = ValueError("End time must be greater than start time")
-
-        url = HttpUrl("https://example.com/video.mp4")
+        video_mocks.clip_video_stream.assert_called_once_with(
+            URL_VIDEO_STR, 10.0, 20.0, accurate=True
+        )
 
-        with pytest.raises(HTTPException) as exc_info:
-            await clip_video_endpoint(url=url, start_time=20.0, end_time=10.0)
+    async def test_clip_video_endpoint_fast_cut(self, video_mocks):
+        """Test that accurate=False is passed through for stream-copy clipping."""
+        video_mocks.clip_video_stream.return_value = iter([b"clipped ", b"video bytes"])
 
-        assert exc_info.value.status_code == 400
-        assert exc_info.value.detail == "End time must be greater than start time"
+        await clip_video_endpoint(url=URL_VIDEO, start_time=10.0, end_time=20.0, accurate=False)
 
-    @pytest.mark.asyncio
-    async def test_clip_video_endpoint_download_error(self, mocker):
-        """Test clipping endpoint with download error."""
-        mock_clip = mocker.patch("src.routes.video.video.clip_video")
-        mock_clip.side_effect = ValueError("Failed to download video")
+        video_mocks.clip_video_stream.assert_called_once_with(
+            URL_VIDEO_STR, 10.0, 20.0, accurate=False
+        )
 
-        url = HttpUrl("https://example.com/nonexistent.mp4")
+    async def test_clip_video_endpoint_invalid_times(self, video_mocks):
+        """Test clipping endpoint with invalid time parameters."""
+        video_mocks.clip_video_stream.side_effect = ValueError("End time must be greater than start time")
 
-        with pytest.raises(HTTPException) as exc_info:
-            await clip_video_endpoint(url=url, start_time=0.0, end_time=10.0)
+        with pytest.raises(HTTPException, match="End time must be greater than start time$") as exc_info:
+            await clip_video_endpoint(url=URL_VIDEO, start_time=20.0, end_time=10.0)
 
         assert exc_info.value.status_code == 400
-        assert "Failed to download video" in exc_info.value.detail
-
-    @pytest.mark.asyncio
-    async def test_clip_video_endpoint_generic_error(self, mocker):
-        """Test clipping endpoint with generic exception."""
-        mock_clip = mocker.patch("src.routes.video.video.clip_video")
-        mock_clip.side_effect = Exception("Unexpected error")
+        video_mocks.clip_video_stream.assert_not_called()
 
-        url = HttpUrl("https://example.com/video.mp4")
+    @pytest.mark.parametrize("error,status,detail", ERROR_CASES, ids=ERROR_CASE_IDS)
+    async def test_clip_video_endpoint_errors(self, video_mocks, error, status, detail):
+        """Test that clipping errors map to 400 (ValueError) or 500."""
+        video_mocks.clip_video_stream.side_effect = error
 
-        with pytest.raises(HTTPException) as exc_info:
-            await clip_video_endpoint(url=url, start_time=0.0, end_time=10.0)
+        with pytest.raises(HTTPException, match=re.escape(detail) + "$") as exc_info:
+            await clip_video_endpoint(url=URL_MISSING, start_time=0.0, end_time=10.0)
 
-        assert exc_info.value.status_code == 500
-        assert "Internal server error" in exc_info.value.detail
+        assert exc_info.value.status_code == status
 
 
-@pytest.mark.unit
 class TestGifEndpoint:
     """Test the GIF endpoint."""
 
-    @pytest.mark.asyncio
-    async def test_url_to_gif_endpoint_success(self, mocker):
-        """Test successful GIF conversion endpoint."""
-        mock_clip_video = mocker.patch("src.routes.video.video.clip_video")
-        mock_gif_from_video = mocker.patch("src.routes.video.gif.from_video")
-        mock_clip_video.return_value = b"video bytes"
-        mock_gif_from_video.return_value = b"gif bytes"
+    # Read-only, so built once rather than validated again in every test
+    OPTIONS_FULL = VideoToGifOptions(
+        url=URL_VIDEO,
+        start_time=0.0,
+        end_time=5.0,
+        resize="50%",
+        speed="2x",
+        fps=8,
+        quality=75,
+        loop="forever",
+    )
+    OPTIONS_MINIMAL = VideoToGifOptions(url=URL_VIDEO, start_time=0.0, end_time=5.0)
+
+    async def test_url_to_gif_endpoint_success(self, video_mocks):
+        """Test successful GIF conversion endpoint using the single-pass ffmpeg path."""
+        video_mocks.extract_video_url.return_value = "https://cdn.example.com/video.mp4"
+        video_mocks.gif_from_url.return_value = b"gif bytes"
+
+        response = await url_to_gif_endpoint(self.OPTIONS_FULL)
 
-        url = HttpUrl("https://example.com/video.mp4")
-
-        params = VideoToGifOptions(
-            url=url,
-            start_time=0.0,
-            end_time=5.0,
+        assert response.body == b"gif bytes"
+        assert response.media_type == "image/gif"
+        assert (
+            response.headers["Content-Disposition"]
+            == "attachment; filename=converted.gif"
+        )
+        video_mocks.extract_video_url.assert_called_once_with(URL_VIDEO_STR)
+        video_mocks.gif_from_url.assert_called_once_with(
+            "https://cdn.example.com/video.mp4",
+            0.0,
+            5.0,
             resize="50%",
             speed="2x",
             fps=8,
             quality=75,
             loop="forever",
         )
-        response = await url_to_gif_endpoint(params)
+        video_mocks.clip_video.assert_not_called()
+
+    async def test_url_to_gif_endpoint_falls_back_to_clip(self, video_mocks):
+        """Test that the yt-dlp clip path is used when ffmpeg can't read the source directly."""
+        video_mocks.extract_video_url.return_value = "https://cdn.example.com/video.m3u8"
+        video_mocks.gif_from_url.side_effect = ValueError("Failed to convert video to GIF: 403 Forbidden")
+        video_mocks.clip_video.return_value = b"video bytes"
+        video_mocks.gif_from_video.return_value = b"gif bytes"
+
+        response = await url_to_gif_endpoint(self.OPTIONS_FULL)
 
         assert response.body == b"gif bytes"
-        assert response.media_type == "image/gif"
-        assert (
-            response.headers["Content-Disposition"]
-            == "attachment; filename=converted.gif"
-        )
-        mock_clip_video.assert_called_once_with("https://example.com/video.mp4", 0.0, 5.0)
-        mock_gif_from_video.assert_called_once_with(
+        video_mocks.clip_video.assert_called_once_with(URL_VIDEO_STR, 0.0, 5.0)
+        video_mocks.gif_from_video.assert_called_once_with(
             video_bytes=b"video bytes",
             resize="50%",
             speed="2x",
@@ -158,61 +241,62 @@ class TestGifEndpoint:
             loop="forever",
         )
 
-    @pytest.mark.asyncio
-    async def test_url_to_gif_endpoint_value_error(self, mocker):
-        """Test GIF endpoint with ValueError."""
-        mock_clip_video = mocker.patch("src.routes.video.video.clip_video")
-        mock_clip_video.side_effect = ValueError("Invalid parameters")
+    async def test_url_to_gif_endpoint_invalid_options(self, video_mocks):
+        """Test that out-of-range options are rejected before anything is downloaded."""
+
+        params = VideoToGifOptions(url=URL_VIDEO, start_time=0.0, end_time=5.0, fps=2)
+        with pytest.raises(HTTPException, match="FPS must be between 3 and 10$") as exc_info:
+            await url_to_gif_endpoint(params)
 
-        url = HttpUrl("https://example.com/video.mp4")
+        assert exc_info.value.status_code == 400
+        video_mocks.extract_video_url.assert_not_called()
+        video_mocks.clip_video.assert_not_called()
 
-        params = VideoToGifOptions(url=url, start_time=0.0, end_time=5.0)
-        with pytest.raises(HTTPException) as exc_info:
+        params = VideoToGifOptions(url=URL_VIDEO, start_time=5.0, end_time=5.0)
+        with pytest.raises(HTTPException, match="End time must be greater than start time$") as exc_info:
             await url_to_gif_endpoint(params)
 
         assert exc_info.value.status_code == 400
-        assert exc_info.value.detail == "Invalid parameters"
+        video_mocks.extract_video_url.assert_not_called()
 
-    @pytest.mark.asyncio
-    async def test_url_to_gif_endpoint_generic_error(self, mocker):
-        """Test GIF endpoint with generic exception."""
-        mock_clip_video = mocker.patch("src.routes.video.video.clip_video")
-        mock_clip_video.side_effect = Exception("Unexpected error")
+    @pytest.mark.parametrize("error,status,detail", ERROR_CASES, ids=ERROR_CASE_IDS)
+    async def test_url_to_gif_endpoint_errors(self, video_mocks, error, status, detail):
+        """Test that errors on the clip fallback map to 400 (ValueError) or 500."""
+        video_mocks.extract_video_url.return_value = "https://cdn.example.com/video.m3u8"
+        video_mocks.gif_from_url.side_effect = ValueError("Failed to convert video to GIF: 403 Forbidden")
+        video_mocks.clip_video.side_effect = error
 
-        url = HttpUrl("https://example.com/video.mp4")
+        with pytest.raises(HTTPException, match=re.escape(detail) + "$") as exc_info:
+            await url_to_gif_endpoint(self.OPTIONS_MINIMAL)
 
-        params = VideoToGifOptions(url=url, start_time=0.0, end_time=5.0)
-        with pytest.raises(HTTPException) as exc_info:
-            await url_to_gif_endpoint(params)
+        assert exc_info.value.status_code == status
+
+    async def test_url_to_gif_endpoint_extract_failure_skips_fallback(self, video_mocks):
+        """Test that a failed extraction maps to 400 without scraping the post again."""
+        video_mocks.extract_video_url.side_effect = ValueError("Failed to extract video URL")
 
-        assert exc_info.value.status_code == 500
-        assert "Internal server error" in exc_info.value.detail
+        with pytest.raises(HTTPException, match="Failed to extract video URL$") as exc_info:
+            await url_to_gif_endpoint(self.OPTIONS_MINIMAL)
+
+        assert exc_info.value.status_code == 400
+        video_mocks.gif_from_url.assert_not_called()
+        video_mocks.clip_video.assert_not_called()
 
 
-@pytest.mark.unit
 class TestFileToGifEndpoint:
     """Test the file-to-gif endpoint."""
 
-    @pytest.mark.asyncio
-    async def test_file_to_gif_endpoint_success(self, mocker):
-        """Test successful GIF creation from uploaded video."""
-        from fastapi import UploadFile
-        from io import BytesIO
+    OPTIONS_FULL = FileToGifOptions(resize="50%", speed="2x", fps=8, quality=75, loop="forever")
 
-        mock_gif_from_video = mocker.patch("src.routes.video.gif.from_video")
-        mock_gif_from_video.return_value = b"gif bytes"
+    async def test_file_to_gif_endpoint_success(self, video_mocks, upload_factory):
+        """Test successful GIF creation from uploaded video."""
+        video_mocks.gif_from_file.return_value = b"gif bytes"
 
-        # Create a mock upload file
-        video_content = b"fake video content"
-        video_file = UploadFile(filename="test_video.mp4", file=BytesIO(video_content))
+        video_file = upload_factory()
 
         response = await file_to_gif(
             video=video_file,
-            resize="50%",
-            speed="2x",
-            fps=8,
-            quality=75,
-            loop="forever",
+            params=self.OPTIONS_FULL,
         )
 
         assert response.body == b"gif bytes"
@@ -221,8 +305,8 @@ class TestFileToGifEndpoint:
             response.headers["Content-Disposition"]
             == "attachment; filename=test_video.gif"
         )
-        mock_gif_from_video.assert_called_once_with(
-            video_bytes=video_content,
+        video_mocks.gif_from_file.assert_called_once_with(
+            video_file=video_file.file,
             resize="50%",
             speed="2x",
             fps=8,
@@ -230,40 +314,16 @@ class TestFileToGifEndpoint:
             loop="forever",
         )
 
-    @pytest.mark.asyncio
-    async def test_file_to_gif_endpoint_value_error(self, mocker):
-        """Test file to GIF endpoint with ValueError."""
-        from fastapi import UploadFile
-        from io import BytesIO
-
-        mock_gif_from_video = mocker.patch("src.routes.video.gif.from_video")
-        mock_gif_from_video.side_effect = ValueError("Invalid video format")
-
-        video_file = UploadFile(
-            filename="test_video.mp4", file=BytesIO(b"fake video content")
-        )
+    @pytest.mark.parametrize("error,status,detail", ERROR_CASES, ids=ERROR_CASE_IDS)
+    async def test_file_to_gif_endpoint_errors(
+        self, video_mocks, upload_factory, error, status, detail
+    ):
+        """Test that conversion errors map to 400 (ValueError) or 500."""
+        video_mocks.gif_from_file.side_effect = error
 
-        with pytest.raises(HTTPException) as exc_info:
-            await file_to_gif(video=video_file)
-
-        assert exc_info.value.status_code == 400
-        assert exc_info.value.detail == "Invalid video format"
-
-    @pytest.mark.asyncio
-    async def test_file_to_gif_endpoint_generic_error(self, mocker):
-        """Test file to GIF endpoint with generic exception."""
-        from fastapi import UploadFile
-        from io import BytesIO
-
-        mock_gif_from_video = mocker.patch("src.routes.video.gif.from_video")
-        mock_gif_from_video.side_effect = Exception("Unexpected error")
-
-        video_file = UploadFile(
-            filename="test_video.mp4", file=BytesIO(b"fake video content")
-        )
+        video_file = upload_factory()
 
-        with pytest.raises(HTTPException) as exc_info:
+        with pytest.raises(HTTPException, match=re.escape(detail) + "$") as exc_info:
             await file_to_gif(video=video_file)
 
-        assert exc_info.value.status_code == 500
-        assert "Internal server error" in exc_info.value.detail
+        assert exc_info.value.status_code == status
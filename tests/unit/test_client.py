@@ -0,0 +1,412 @@
+import asyncio
+import httpx
+import json
+import os
+import pytest
+from urllib.parse import urljoin
+
+from src import client as client_module
+from src.client import (
+    EXTRACT_CACHE_TTL,
+    AsyncVideoServicesClient,
+    VideoServicesClient,
+    _gather_limited,
+    _get_shared_client,
+)
+
+BASE_URL = "http://localhost:8000"
+POST_URL = "https://x.com/user/status/123"
+
+
+class _FailingStream(httpx.SyncByteStream):
+    """Response body that breaks off after its first chunk."""
+
+    def __iter__(self):
+        yield b"partial"
+        raise httpx.ReadError("connection reset")
+
+
+class _AsyncFailingStream(httpx.AsyncByteStream):
+    """Async response body that breaks off after its first chunk."""
+
+    async def __aiter__(self):
+        yield b"partial"
+        raise httpx.ReadError("connection reset")
+
+
+@pytest.fixture
+def mock_client():
+    """Build sync clients whose requests are answered by a MockTransport handler."""
+    clients = []
+
+    def _build(handler, **kwargs):
+        client = VideoServicesClient(base_url=BASE_URL, **kwargs)
+        client.client.close()
+        client.client = httpx.Client(transport=httpx.MockTransport(handler))
+        clients.append(client)
+        return client
+
+    yield _build
+    for client in clients:
+        client.client.close()
+
+
+@pytest.fixture
+async def mock_async_client():
+    """Build async clients whose requests are answered by a MockTransport handler."""
+    clients = []
+
+    def _build(handler, **kwargs):
+        client = AsyncVideoServicesClient(base_url=BASE_URL, **kwargs)
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        clients.append(client)
+        return client
+
+    yield _build
+    for client in clients:
+        await client.client.aclose()
+
+
+@pytest.mark.unit
+class TestClientUrl:
+    """Unit tests for client URL building."""
+
+    @pytest.mark.parametrize(
+        "base_url", ["http://localhost:8000", "https://api.example.com/", "https://example.com/prefix"]
+    )
+    @pytest.mark.parametrize(
+        "endpoint", ["/", "/health", "/api/video/extract-url", "api/video/clip"]
+    )
+    def test_url_matches_urljoin(self, base_url, endpoint):
+        """Test that the f-string fast path builds the same URLs as urljoin did."""
+        client = VideoServicesClient(base_url=base_url)
+
+        expected = urljoin(client.base_url + "/", endpoint.lstrip("/"))
+        assert client._url(endpoint) == expected
+
+        client.client.close()
+
+
+@pytest.mark.unit
+class TestGatherLimited:
+    """Unit tests for the async batch concurrency limit."""
+
+    async def test_gather_limited_caps_concurrency_and_keeps_order(self):
+        """Test that no more than `concurrency` awaitables run at once."""
+        running = 0
+        peak = 0
+
+        async def job(i):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return i
+
+        result = await _gather_limited((job(i) for i in range(10)), concurrency=3)
+
+        assert result == list(range(10))
+        assert peak == 3
+
+
+@pytest.mark.unit
+class TestExtractCache:
+    """Unit tests for the client-side extract_video_url cache."""
+
+    def test_cached_extract_expires_after_ttl(self, mocker):
+        """Test that cached resolutions are dropped once they are older than the TTL."""
+        mock_time = mocker.patch("src.client.time.monotonic", return_value=1000.0)
+        client = VideoServicesClient(base_url="http://localhost:8000")
+
+        client._cache_extract("https://x.com/post", "https://cdn.example.com/video.mp4")
+        assert client._get_cached_extract("https://x.com/post") == "https://cdn.example.com/video.mp4"
+
+        mock_time.return_value = 1000.0 + EXTRACT_CACHE_TTL
+        assert client._get_cached_extract("https://x.com/post") is None
+        assert "https://x.com/post" not in client._extract_cache
+
+        client.client.close()
+
+
+@pytest.mark.unit
+class TestDiskCache:
+    """Unit tests for the optional on-disk clip/GIF cache."""
+
+    def test_disk_cache_disabled_by_default(self):
+        """Test that no cache path is produced unless cache_dir is set."""
+        client = VideoServicesClient(base_url="http://localhost:8000")
+
+        assert client._disk_cache_path("clip", "https://x.com/post", 0, 3) is None
+
+        client.client.close()
+
+    def test_disk_cache_round_trip(self, temp_dir):
+        """Test storing a result and serving it as bytes or copied to save_to."""
+        client = VideoServicesClient(base_url="http://localhost:8000", cache_dir=temp_dir / "cache")
+        cache_path = client._disk_cache_path("clip", "https://x.com/post", 0, 3)
+
+        assert client._load_from_disk_cache(cache_path, None, "clipped video") is None
+
+        client._store_in_disk_cache(cache_path, b"video bytes")
+
+        assert client._load_from_disk_cache(cache_path, None, "clipped video") == b"video bytes"
+        saved = client._load_from_disk_cache(cache_path, temp_dir / "out" / "clip.mp4", "clipped video")
+        assert saved.read_bytes() == b"video bytes"
+        # Different inputs map to a different entry
+        assert client._disk_cache_path("clip", "https://x.com/post", 0, 4) != cache_path
+
+        client.client.close()
+
+    def test_disk_cache_evicts_least_recently_used(self, temp_dir):
+        """Test that the oldest entries are removed once max_cache_bytes is exceeded."""
+        client = VideoServicesClient(
+            base_url="http://localhost:8000", cache_dir=temp_dir / "cache", max_cache_bytes=10
+        )
+        old_path = client._disk_cache_path("clip", "old")
+        new_path = client._disk_cache_path("clip", "new")
+
+        client._store_in_disk_cache(old_path, b"x" * 6)
+        os.utime(old_path, (0, 0))
+        client._store_in_disk_cache(new_path, b"y" * 6)
+
+        assert not old_path.exists()
+        assert new_path.read_bytes() == b"y" * 6
+
+        client.client.close()
+
+    def test_disk_cache_keys_include_base_url(self, temp_dir):
+        """Test that clients for different servers sharing a cache_dir don't share entries."""
+        local = VideoServicesClient(base_url="http://localhost:8000", cache_dir=temp_dir / "cache")
+        remote = VideoServicesClient(base_url="https://api.example.com", cache_dir=temp_dir / "cache")
+
+        assert local._disk_cache_path("clip", "https://x.com/post", 0, 3) != remote._disk_cache_path(
+            "clip", "https://x.com/post", 0, 3
+        )
+
+        local.client.close()
+        remote.client.close()
+
+    def test_disk_cache_store_leaves_no_temporary_files(self, temp_dir):
+        """Test that storing an entry replaces its unique temporary file."""
+        client = VideoServicesClient(base_url="http://localhost:8000", cache_dir=temp_dir / "cache")
+        cache_path = client._disk_cache_path("clip", "https://x.com/post", 0, 3)
+
+        client._store_in_disk_cache(cache_path, b"video bytes")
+
+        assert list(cache_path.parent.iterdir()) == [cache_path]
+
+        client.client.close()
+
+
+@pytest.mark.unit
+class TestOutputPath:
+    """Unit tests for resolving and preparing save_to paths."""
+
+    def test_prepare_output_path_recreates_removed_directory(self, temp_dir):
+        """Test that saving again after the output directory was deleted recreates it."""
+        client = VideoServicesClient(base_url="http://localhost:8000")
+        save_to = temp_dir / "out" / "clip.mp4"
+
+        assert client._prepare_output_path(save_to) == save_to
+        save_to.parent.rmdir()
+
+        assert client._prepare_output_path(save_to) == save_to
+        assert save_to.parent.is_dir()
+
+        client.client.close()
+
+
+@pytest.mark.unit
+class TestDownload:
+    """Unit tests for streaming clip/GIF responses to save_to."""
+
+    def test_clip_video_streams_to_save_to(self, mock_client, temp_dir):
+        """Test that the body lands in save_to and the saved path is returned."""
+        client = mock_client(lambda request: httpx.Response(200, content=b"clip bytes"))
+        save_to = temp_dir / "out" / "clip.mp4"
+
+        result = client.clip_video(POST_URL, 0, 3, save_to=save_to)
+
+        assert result == save_to
+        assert save_to.read_bytes() == b"clip bytes"
+        assert list(save_to.parent.iterdir()) == [save_to]
+
+    def test_download_applies_current_umask(self, mock_client, temp_dir):
+        """Test that saved files get the umask-based mode of a plain open(), not 0600."""
+        client = mock_client(lambda request: httpx.Response(200, content=b"clip bytes"))
+        save_to = temp_dir / "clip.mp4"
+
+        previous = os.umask(0o027)
+        try:
+            client.clip_video(POST_URL, 0, 3, save_to=save_to)
+        finally:
+            os.umask(previous)
+
+        assert save_to.stat().st_mode & 0o777 == 0o640
+
+    def test_download_truncates_unused_preallocation(self, mock_client, temp_dir):
+        """Test that space reserved from Content-Length is dropped when the body is shorter."""
+        client = mock_client(
+            lambda request: httpx.Response(200, headers={"content-length": "4096"}, content=b"gif")
+        )
+        save_to = temp_dir / "anim.gif"
+
+        client.url_to_gif(POST_URL, 0, 3, save_to=save_to)
+
+        assert save_to.read_bytes() == b"gif"
+
+    def test_download_failure_mid_stream_keeps_existing_file(self, mock_client, temp_dir):
+        """Test that a broken stream leaves neither a partial file nor a clobbered result."""
+        client = mock_client(
+            lambda request: httpx.Response(
+                200, headers={"content-length": "4096"}, stream=_FailingStream()
+            )
+        )
+        save_to = temp_dir / "clip.mp4"
+        save_to.write_bytes(b"earlier result")
+
+        with pytest.raises(httpx.ReadError):
+            client.clip_video(POST_URL, 0, 3, save_to=save_to)
+
+        assert save_to.read_bytes() == b"earlier result"
+        assert list(temp_dir.iterdir()) == [save_to]
+
+    def test_download_http_error_creates_no_file(self, mock_client, temp_dir):
+        """Test that an error status raises before anything is written."""
+        client = mock_client(lambda request: httpx.Response(400, json={"detail": "bad range"}))
+        save_to = temp_dir / "clip.mp4"
+
+        with pytest.raises(httpx.HTTPStatusError):
+            client.clip_video(POST_URL, 5, 3, save_to=save_to)
+
+        assert list(temp_dir.iterdir()) == []
+
+    async def test_async_clip_video_streams_to_save_to(self, mock_async_client, temp_dir):
+        """Test that the async client streams the body to save_to and returns the path."""
+        client = mock_async_client(
+            lambda request: httpx.Response(200, headers={"content-length": "4096"}, content=b"clip bytes")
+        )
+        save_to = temp_dir / "clip.mp4"
+
+        result = await client.clip_video(POST_URL, 0, 3, save_to=save_to)
+
+        assert result == save_to
+        assert save_to.read_bytes() == b"clip bytes"
+
+    async def test_async_download_failure_mid_stream_removes_partial_file(
+        self, mock_async_client, temp_dir
+    ):
+        """Test that a broken async stream leaves no file behind."""
+        client = mock_async_client(
+            lambda request: httpx.Response(
+                200, headers={"content-length": "4096"}, stream=_AsyncFailingStream()
+            )
+        )
+        save_to = temp_dir / "clip.mp4"
+
+        with pytest.raises(httpx.ReadError):
+            await client.clip_video(POST_URL, 0, 3, save_to=save_to)
+
+        assert list(temp_dir.iterdir()) == []
+
+
+@pytest.mark.unit
+class TestMakeGifFromFile:
+    """Unit tests for uploading a local video for GIF conversion."""
+
+    def test_make_gif_from_file_sends_options_as_query_params(self, mock_client, temp_dir):
+        """Test that GIF options go in the query string and the video in the multipart body."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, content=b"gif")
+
+        client = mock_client(handler)
+        video_file = temp_dir / "input.mp4"
+        video_file.write_bytes(b"video bytes")
+
+        result = client.make_gif_from_file(video_file, resize="50%", speed="2x", fps=5, quality=60, loop="once")
+
+        assert result == b"gif"
+        (request,) = requests
+        assert request.method == "POST"
+        assert request.url.path == "/api/video/to-gif/from-file"
+        assert dict(request.url.params) == {
+            "resize": "50%", "speed": "2x", "fps": "5", "quality": "60", "loop": "once"
+        }
+        body = request.read()
+        assert b'name="video"; filename="input.mp4"' in body
+        assert b"video bytes" in body
+
+
+@pytest.mark.unit
+class TestSharedClient:
+    """Unit tests for the clients shared by the quick_* helpers."""
+
+    @pytest.fixture(autouse=True)
+    def client_cache(self, monkeypatch):
+        """Give each test an empty shared-client cache and close what it creates."""
+        cache = {}
+        monkeypatch.setattr(client_module, "_CLIENT_CACHE", cache)
+        yield cache
+        for client in cache.values():
+            client.client.close()
+
+    def test_shared_client_is_reused_for_the_same_settings(self):
+        """Test that repeated calls with the same settings reuse one pooled client."""
+        first = _get_shared_client(base_url=BASE_URL)
+
+        assert _get_shared_client(base_url=BASE_URL + "/") is first
+
+    def test_shared_client_differs_per_settings(self, client_cache):
+        """Test that different servers or pool options get their own client."""
+        local = _get_shared_client(base_url=BASE_URL)
+        remote = _get_shared_client(base_url="https://api.example.com")
+        small_pool = _get_shared_client(base_url=BASE_URL, max_connections=2)
+
+        assert len({id(local), id(remote), id(small_pool)}) == 3
+        assert len(client_cache) == 3
+
+
+@pytest.mark.unit
+class TestAsyncBatch:
+    """Unit tests for the async batch_* helpers."""
+
+    async def test_batch_extract_keeps_input_order(self, mock_async_client):
+        """Test that extracted URLs come back in the order of the post URLs."""
+        async def handler(request):
+            post_url = request.url.params["url"]
+            # Answer later requests first so completion order differs from input order
+            await asyncio.sleep(0.01 if post_url.endswith("0") else 0)
+            return httpx.Response(200, content=json.dumps({"video_url": post_url + ".mp4"}).encode())
+
+        client = mock_async_client(handler)
+        urls = [f"{POST_URL}{i}" for i in range(5)]
+
+        assert await client.batch_extract(urls, concurrency=2) == [u + ".mp4" for u in urls]
+
+    async def test_batch_clip_and_gif(self, mock_async_client):
+        """Test that batch_clip and batch_gif hit their endpoints once per input."""
+        paths = []
+
+        def handler(request):
+            paths.append(request.url.path)
+            return httpx.Response(200, content=request.url.params["url"].encode())
+
+        client = mock_async_client(handler)
+
+        clips = await client.batch_clip([(POST_URL, 0, 3), (POST_URL + "?v=2", 1, 4)])
+        gifs = await client.batch_gif([POST_URL], 0, 3, fps=5)
+
+        assert clips == [POST_URL.encode(), (POST_URL + "?v=2").encode()]
+        assert gifs == [POST_URL.encode()]
+        assert sorted(paths) == ["/api/video/clip"] * 2 + ["/api/video/to-gif/from-url"]
+
+    async def test_batch_gif_rejects_save_to(self, mock_async_client, temp_dir):
+        """Test that one save_to for many GIFs is refused before any request is sent."""
+        client = mock_async_client(lambda request: pytest.fail("no request expected"))
+
+        with pytest.raises(TypeError, match="save_to"):
+            await client.batch_gif([POST_URL, POST_URL + "?v=2"], 0, 3, save_to=temp_dir / "anim.gif")
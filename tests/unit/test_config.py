@@ -0,0 +1,90 @@
+import os
+import pytest
+
+from src.config import Config, load_dotenv
+
+
+@pytest.mark.unit
+class TestLoadDotenv:
+    """Unit tests for the dependency-free .env loader."""
+
+    def test_load_dotenv_parses_and_unquotes(self, temp_dir, monkeypatch):
+        """Test KEY=VALUE parsing, comments, quotes and values containing '='."""
+        for key in ("VS_TEST_PLAIN", "VS_TEST_DOUBLE", "VS_TEST_SINGLE", "VS_TEST_EQUALS", "VS_TEST_QUOTE"):
+            # Register the variable with monkeypatch so it is removed after the test
+            monkeypatch.setenv(key, "")
+            monkeypatch.delenv(key)
+
+        env_path = temp_dir / ".env"
+        env_path.write_text(
+            "# comment\n"
+            "\n"
+            "VS_TEST_PLAIN = plain\n"
+            'VS_TEST_DOUBLE="double quoted"\n'
+            "VS_TEST_SINGLE='single quoted'\n"
+            "VS_TEST_EQUALS=a=b\n"
+            'VS_TEST_QUOTE="\n'
+            "not a pair\n"
+        )
+
+        load_dotenv(env_path)
+
+        assert os.environ["VS_TEST_PLAIN"] == "plain"
+        assert os.environ["VS_TEST_DOUBLE"] == "double quoted"
+        assert os.environ["VS_TEST_SINGLE"] == "single quoted"
+        assert os.environ["VS_TEST_EQUALS"] == "a=b"
+        # A lone quote is not a quoted value
+        assert os.environ["VS_TEST_QUOTE"] == '"'
+
+    def test_load_dotenv_keeps_existing_environment(self, temp_dir, monkeypatch):
+        """Test that variables already set in the environment win over the file."""
+        monkeypatch.setenv("VIDEO_API_BASE_URL", "https://from-env.example.com")
+        env_path = temp_dir / ".env"
+        env_path.write_text("VIDEO_API_BASE_URL=https://from-file.example.com\n")
+
+        config = Config.from_env(str(env_path))
+
+        assert config.base_url == "https://from-env.example.com"
+
+    def test_load_dotenv_missing_file(self, temp_dir):
+        """Test that a missing .env file is ignored."""
+        load_dotenv(temp_dir / "missing.env")
+
+    def test_from_env_parses_each_env_file_once(self, temp_dir, mocker):
+        """Test that repeated Config.from_env calls don't re-parse an unchanged .env file."""
+        env_path = temp_dir / ".env"
+        env_path.write_text("VS_TEST_ONCE=1\n")
+        mock_parse = mocker.patch("src.config._parse_dotenv", return_value={})
+
+        Config.from_env(str(env_path))
+        Config.from_env(str(env_path))
+
+        mock_parse.assert_called_once_with(env_path)
+
+    def test_from_env_picks_up_edited_env_file(self, temp_dir, monkeypatch):
+        """Test that values loaded from a .env file follow later edits to it."""
+        monkeypatch.setenv("VIDEO_API_BASE_URL", "")
+        monkeypatch.delenv("VIDEO_API_BASE_URL")
+        env_path = temp_dir / ".env"
+        env_path.write_text("VIDEO_API_BASE_URL=https://first.example.com\n")
+        os.utime(env_path, ns=(0, 1_000_000_000))
+
+        assert Config.from_env(str(env_path)).base_url == "https://first.example.com"
+
+        env_path.write_text("VIDEO_API_BASE_URL=https://second.example.com\n")
+        os.utime(env_path, ns=(0, 2_000_000_000))
+
+        assert Config.from_env(str(env_path)).base_url == "https://second.example.com"
+
+    def test_from_env_edit_keeps_environment_precedence(self, temp_dir, monkeypatch):
+        """Test that re-reading an edited .env file doesn't override variables set elsewhere."""
+        monkeypatch.setenv("VIDEO_API_BASE_URL", "https://from-env.example.com")
+        env_path = temp_dir / ".env"
+        env_path.write_text("VIDEO_API_BASE_URL=https://first.example.com\n")
+        os.utime(env_path, ns=(0, 1_000_000_000))
+        Config.from_env(str(env_path))
+
+        env_path.write_text("VIDEO_API_BASE_URL=https://second.example.com\n")
+        os.utime(env_path, ns=(0, 2_000_000_000))
+
+        assert Config.from_env(str(env_path)).base_url == "https://from-env.example.com"